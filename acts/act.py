@@ -1,5 +1,5 @@
-cache = {}
+from functools import lru_cache
+
+@lru_cache(maxsize=128)
 def memoize(n):
-    if n not in cache:
-        cache[n] = [0] * 10000  # large list
-    return cache[n]
\ No newline at end of file
+    return (0,) * 10000  # immutable, so one cached value is safe to share
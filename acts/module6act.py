@@ -1,19 +1,21 @@
-def factorial(n, depth=0):
-    indent = "  " * depth  # visual indent for recursion level
+from functools import cache
 
+VERBOSE = False  # set to True to trace each step
+
+@cache
+def factorial(n):
     if not isinstance(n, int) or n < 0:
         raise ValueError(f"[Error] Invalid input: n must be a non-negative integer, got {n}")
 
-    print(f"{indent}[Debug] Function factorial called with argument n={n}")
+    if __debug__ and VERBOSE:
+        print(f"[Debug] Function factorial called with argument n={n}")
 
-    if n == 0:
-        print(f"{indent}[Debug] Base case reached, returning 1.")
-        return 1
-    else:
-        print(f"{indent}[Debug] Recursively calling factorial({n - 1})")
-        result = n * factorial(n - 1, depth + 1)
-        print(f"{indent}[Debug] Computed factorial({n}) = {result}")
-        return result
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+        if __debug__ and VERBOSE:
+            print(f"  [Debug] Computed factorial({i}) = {result}")
+    return result
 
 # Entry point
 try:
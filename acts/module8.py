@@ -1,52 +1,71 @@
-from abc import ABC, abstractmethod
+import operator
+from typing import Any, Callable, Protocol
 
-class Expression(ABC):
-    @abstractmethod
-    def evaluate(self):
+class Expression(Protocol):
+    def evaluate(self) -> Any:
         """Evaluate the expression."""
-        pass
+        ...
+
+    def compile(self) -> Callable[[], Any]:
+        """Return a zero-argument function that evaluates the expression."""
+        ...
 
-class Number(Expression):
+def constant(value) -> Callable[[], Any]:
+    def compiled():
+        return value
+    compiled.is_constant = True
+    return compiled
+
+class Number:
     def __init__(self, value):
         self.value = value
     
     def evaluate(self):
         return self.value
 
-class Add(Expression):
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
-    
-    def evaluate(self):
-        return self.left.evaluate() + self.right.evaluate()
+    def compile(self):
+        return constant(self.value)
 
-class Subtract(Expression):
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
-    
-    def evaluate(self):
-        return self.left.evaluate() - self.right.evaluate()
+class BinaryExpression:
+    op = None
 
-class Multiply(Expression):
     def __init__(self, left, right):
         self.left = left
         self.right = right
-    
-    def evaluate(self):
-        return self.left.evaluate() * self.right.evaluate()
 
-class Divide(Expression):
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
-    
+    def apply(self, left, right):
+        return self.op(left, right)
+
     def evaluate(self):
-        right_val = self.right.evaluate()
-        if right_val == 0:
+        return self.apply(self.left.evaluate(), self.right.evaluate())
+
+    def compile(self):
+        left = self.left.compile()
+        right = self.right.compile()
+        apply = self.apply
+        # Fold constant subtrees now; an error is left for the call to raise,
+        # as evaluate() would
+        if getattr(left, 'is_constant', False) and getattr(right, 'is_constant', False):
+            try:
+                return constant(apply(left(), right()))
+            except Exception:
+                pass
+        return lambda: apply(left(), right())
+
+class Add(BinaryExpression):
+    op = staticmethod(operator.add)
+
+class Subtract(BinaryExpression):
+    op = staticmethod(operator.sub)
+
+class Multiply(BinaryExpression):
+    op = staticmethod(operator.mul)
+
+class Divide(BinaryExpression):
+    def apply(self, left, right):
+        if right == 0:
             raise ValueError("Division by zero")
-        return self.left.evaluate() / right_val
+        return left / right
 
 # Program to demonstrate polymorphism
 if __name__ == "__main__":
@@ -66,4 +85,4 @@ if __name__ == "__main__":
             result = expr.evaluate()
             print(f"Expression {i}: {result}")
         except ValueError as e:
-            print(f"Expression {i}: Error - {e}")
\ No newline at end of file
+            print(f"Expression {i}: Error - {e}")
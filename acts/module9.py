@@ -1,9 +1,14 @@
 from typing import Callable, Any, Dict, List
 
+_compiled: Dict[str, Callable] = {}
+
 # Pure lambda parser (dummy - returns a lambda)
 def parse_lambda(expr: str) -> Callable:
-    # For simplicity: "lambda x: x + 1" -> eval as lambda
-    return eval(expr)
+    # For simplicity: "lambda x: x + 1" -> eval as lambda, compiled once per source
+    fn = _compiled.get(expr)
+    if fn is None:
+        fn = _compiled[expr] = eval(compile(expr, '<lambda>', 'eval'), {'__builtins__': {}})
+    return fn
 
 # Environment is immutable
 def extend_env(env: Dict[str, Any], key: str, value: Any) -> Dict[str, Any]:
@@ -13,7 +18,7 @@ def extend_env(env: Dict[str, Any], key: str, value: Any) -> Dict[str, Any]:
 
 # Functional map using higher-order function
 def functional_map(fn: Callable, lst: List[Any]) -> List[Any]:
-    return list(map(fn, lst))
+    return [fn(x) for x in lst]
 
 # Closure with retained environment
 def make_closure(param: str, body: Callable, env: Dict[str, Any]) -> Callable:
@@ -1,16 +1,72 @@
-from threading import Thread
-from typing import List
+import atexit
+import os
+import pickle
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, List
 from interpreter import Interpreter
 
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+                atexit.register(_process_pool.shutdown)
+    return _process_pool
+
+def _gil_enabled() -> bool:
+    # Free-threaded (PEP 703) builds expose sys._is_gil_enabled()
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+def _run_block(state: bytes, block: bytes) -> List[Any]:
+    functions, structs, variables = pickle.loads(state)
+    block = pickle.loads(block)
+    interpreter = Interpreter()
+    interpreter.functions = functions
+    interpreter.structs = structs
+    interpreter.variables = variables
+    interpreter.evaluate(block)
+    return interpreter.printed_values
+
 class ParallelExecutor:
     def __init__(self, interpreter: Interpreter):
         self.interpreter = interpreter
 
     def execute_parallel(self, blocks: List['Node']):
-        threads = []
-        for block in blocks:
-            thread = Thread(target=self.interpreter.evaluate, args=(block,))
-            threads.append(thread)
-            thread.start()
-        for thread in threads:
-            thread.join()
\ No newline at end of file
+        # Interpreter code holds the GIL, so threads only help on free-threaded builds
+        if not _gil_enabled():
+            with ThreadPoolExecutor(max_workers=len(blocks) or 1) as pool:
+                for future in [pool.submit(self.interpreter.evaluate, block) for block in blocks]:
+                    future.result()
+            return
+
+        # Each block runs in its own process against a snapshot of the current
+        # state; only printed output comes back, variable writes stay isolated.
+        # Lambda values are plain LambdaNodes, so they pickle as AST and run
+        # on the child's interpreter
+        interpreter = self.interpreter
+        try:
+            state = pickle.dumps((interpreter.functions, interpreter.structs, interpreter.variables))
+            payloads = [pickle.dumps(block) for block in blocks]
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # State that cannot be pickled runs serially; nothing has run yet
+            for block in blocks:
+                interpreter.evaluate(block)
+            return
+        # Errors raised by the program inside a worker propagate from result()
+        futures = [_get_process_pool().submit(_run_block, state, payload) for payload in payloads]
+        results = [future.result() for future in futures]
+        for printed in results:
+            # Hand the child's output to the sink as _eval_print would
+            if interpreter.print_sink is not None:
+                for value in printed:
+                    interpreter.print_sink(str(value))
+                    interpreter.streamed = True
+            else:
+                interpreter.printed_values.extend(printed)
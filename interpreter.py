@@ -1,303 +1,736 @@
 import logging
-from typing import Any, List, Optional
+from typing import Any, Callable, List, Optional
 from nodes import *
 from token_type import TokenType
 from function import Function
 from structs import StructDef, StructInstance
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+import atexit
+import copy
+import operator
+import os
 import sys
+import threading
 
 # Increase recursion limit for small recursive functions
 sys.setrecursionlimit(10000)
 
+BINOPS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.truediv,
+    TokenType.EXPONENTIATION: operator.pow,
+    TokenType.MODULUS: operator.mod,
+}
+
+UNARYOPS = {
+    TokenType.PLUS: operator.pos,
+    TokenType.MINUS: operator.neg,
+}
+
+
+COMPAREOPS = {
+    TokenType.EQUAL: operator.eq,
+    TokenType.NOT_EQUAL: operator.ne,
+    TokenType.LESS: operator.lt,
+    TokenType.GREATER: operator.gt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.GREATER_EQUAL: operator.ge,
+}
+
+ZERO_ERRORS = {
+    TokenType.DIVIDE: "Division by zero",
+    TokenType.MODULUS: "Modulus by zero",
+}
+
+OP_SYMBOLS = {
+    TokenType.PLUS: '+',
+    TokenType.MINUS: '-',
+    TokenType.MULTIPLY: '*',
+    TokenType.DIVIDE: '/',
+    TokenType.EXPONENTIATION: '^',
+    TokenType.MODULUS: '%',
+    TokenType.AND: 'AND',
+    TokenType.OR: 'OR',
+    TokenType.LESS: '<',
+    TokenType.GREATER: '>',
+    TokenType.LESS_EQUAL: '<=',
+    TokenType.GREATER_EQUAL: '>=',
+}
+
+# Operator expressions are compiled once into flat postfix code and run by
+# Interpreter._eval_code; any other node inside them becomes an OP_EVAL leaf
+OP_CONST = 0
+OP_LOAD = 1
+OP_BINOP = 2
+OP_COMPARE = 3
+OP_LOGICAL = 4
+OP_UNARY = 5
+OP_EVAL = 6
+
+def apply_binop(node: BinOpNode, left: Any, right: Any) -> Any:
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        try:
+            return BINOPS[node.op](left, right)
+        except ZeroDivisionError:
+            raise Exception(f"{ZERO_ERRORS.get(node.op, 'Division by zero')} at line {node.line}")
+        except OverflowError:
+            raise Exception(f"Numeric overflow in '{OP_SYMBOLS[node.op]}' operation at line {node.line}")
+    if node.op is TokenType.PLUS and isinstance(left, str) and isinstance(right, str):
+        return left + right
+    raise Exception(f"Type mismatch in '{OP_SYMBOLS[node.op]}' operation at line {node.line}")
+
+def apply_unary(node: UnaryOpNode, operand: Any) -> Any:
+    if node.op is TokenType.NOT:
+        if isinstance(operand, bool):
+            return not operand
+        raise Exception(f"Type mismatch in 'NOT' operation at line {node.line}")
+    if isinstance(operand, (int, float)):
+        return UNARYOPS[node.op](operand)
+    raise Exception(f"Type mismatch in unary '{OP_SYMBOLS[node.op]}' operation at line {node.line}")
+
+def check_logical(node: LogicalNode, value: Any) -> bool:
+    if type(value) is bool:
+        return value
+    raise Exception(f"Type mismatch in '{OP_SYMBOLS[node.op]}' operation at line {node.line}")
+
+def apply_compare(node: CompareNode, left: Any, right: Any) -> Any:
+    if node.op is TokenType.EQUAL or node.op is TokenType.NOT_EQUAL:
+        return COMPAREOPS[node.op](left, right)
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return COMPAREOPS[node.op](left, right)
+    raise Exception(f"Type mismatch in '{OP_SYMBOLS[node.op]}' operation at line {node.line}")
+
+DEFERRED_PRINT_TYPES = frozenset((float, int, str, bool, type(None)))
+
+# Raised by `return` inside a call and caught in Interpreter._call, so blocks
+# and loops don't have to inspect every statement result
+class ReturnValue(Exception):
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
 # Custom exception to signal input is needed
 class InputRequired(Exception):
     def __init__(self, line: int):
         self.line = line
+        # Top-level statement to resume from, set by run_statements
+        self.index = None
         super().__init__("Input required")
 
+# Scopes map names straight to values; null is None, so lookups use this
+# sentinel for a name that is not bound
+MISSING = object()
+
+# Bumped whenever a function or struct is (re)defined so call sites that cached
+# their target in FunctionCallNode._target resolve it again
+_call_generation = 0
+
+# `parallel` blocks share one thread pool for the whole process. Evaluating
+# the AST is pure Python and holds the GIL, so blocks interleave rather than
+# run on separate cores. concurrency.ParallelExecutor, which runs blocks in
+# processes, is a separate API that `parallel` blocks do not use
+_parallel_pool = None
+_parallel_pool_lock = threading.Lock()
+# Marks the pool's own threads. Whether a block may wait on the pool depends
+# on the thread running it, not on the interpreter: a lambda or callee can
+# carry a block onto a worker through an interpreter that never ran in one
+_pool_thread = threading.local()
+
+def _mark_pool_thread():
+    _pool_thread.active = True
+
+def on_pool_thread() -> bool:
+    return getattr(_pool_thread, 'active', False)
+
+def get_parallel_pool() -> ThreadPoolExecutor:
+    global _parallel_pool
+    if _parallel_pool is None:
+        # Flask may evaluate several programs at once; create the pool only once
+        with _parallel_pool_lock:
+            if _parallel_pool is None:
+                _parallel_pool = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='parallel', initializer=_mark_pool_thread)
+                atexit.register(_parallel_pool.shutdown)
+    return _parallel_pool
+
 class ParallelExecutor:
     def __init__(self, interpreter: 'Interpreter', block: BlockNode):
         self.interpreter = interpreter
         self.block = block
 
     def execute(self):
-        self.interpreter.evaluate(self.block)
+        # Give the block its own scope stack so frames pushed by blocks
+        # running at the same time don't interleave. Everything the block
+        # calls, lambdas included, runs on this worker; nested parallel
+        # blocks are inlined by thread (on_pool_thread), not by interpreter
+        worker = copy.copy(self.interpreter)
+        worker.scopes = list(self.interpreter.scopes)
+        worker.evaluate(self.block)
+        if worker.streamed:
+            self.interpreter.streamed = True
 
 class Interpreter:
     def __init__(self, verbose: bool = False):
-        self.variables: dict = {}
+        # Innermost scope last; calls push a frame holding only their bindings
+        self.scopes: List[dict] = [{}]
         self.functions: dict = {}
         self.structs: dict = {}
-        self.printed_values: List[Any] = []
+        self.printed_values: deque = deque()
+        # When set, print() hands each value's text straight to the sink
+        # instead of collecting it; streamed records that it did
+        self.print_sink: Optional[Callable[[str], Any]] = None
+        self.streamed = False
         self.verbose = verbose
         self.input_value = None
         if verbose:
             logging.basicConfig(level=logging.DEBUG)
 
+    def get_printed(self) -> List[str]:
+        return [str(value) for value in self.printed_values]
+
+    @property
+    def variables(self) -> dict:
+        return self.scopes[0]
+
+    @variables.setter
+    def variables(self, value: dict):
+        self.scopes[0] = value
+
+    def _find(self, name: str) -> Any:
+        for scope in reversed(self.scopes):
+            value = scope.get(name, MISSING)
+            if value is not MISSING:
+                return value
+        return MISSING
+
+    def _call(self, body: Node, frame: dict) -> Any:
+        self.scopes.append(frame)
+        try:
+            return self.evaluate(body)
+        except ReturnValue as ret:
+            return ret.value
+        finally:
+            self.scopes.pop()
+
     def set_input(self, value: str):
         self.input_value = value
 
+    def run_statements(self, statements: List[Node], start: int, emit: Callable[[List[str]], Any]):
+        # Runs statements[start:], handing each statement's printed lines (or
+        # the value of a bare expression) to emit
+        evaluate = self.evaluate
+        printed = self.printed_values
+        for index in range(start, len(statements)):
+            statement = statements[index]
+            self.streamed = False
+            try:
+                result = evaluate(statement)
+            except InputRequired as e:
+                e.index = index
+                raise
+            if printed:
+                emit(self.get_printed())
+                printed.clear()
+            elif result is not None and not statement.suppress_result and not self.streamed:
+                emit([str(result)])
+
     def evaluate(self, node: Node) -> Any:
         if self.verbose:
             logging.debug(f"Evaluating {type(node).__name__} at line {node.line}")
-        
+        handler = node._eval
+        if handler is None:
+            handler = self._resolve_handler(type(node))
+            if handler is None:
+                raise Exception(f"Unknown node type {type(node).__name__} at line {node.line}")
+            # Plain functions, not bound methods, so an AST shared between
+            # interpreters (or parallel blocks) always caches the same value
+            node._eval = handler
+        return handler(self, node)
+
+    def _resolve_handler(self, kind: type):
+        handler = self._dispatch.get(kind)
+        if handler is None:
+            # Node subclasses use their nearest registered base's handler
+            for base in kind.__mro__[1:]:
+                handler = self._dispatch.get(base)
+                if handler is not None:
+                    self._dispatch[kind] = handler
+                    break
+        return handler
+
+    def _eval_number(self, node: NumberNode) -> Any:
+        return node.value
+
+    def _eval_literal(self, node: Node) -> Any:
+        return node.value
+
+    def _eval_null(self, node: NullNode) -> Any:
+        return None
+
+    def _eval_var(self, node: VarNode) -> Any:
+        value = self.scopes[-1].get(node.name, MISSING)
+        if value is MISSING:
+            value = self._find(node.name)
+            if value is MISSING:
+                raise Exception(f"Access to undefined or deleted variable '{node.name}' at line {node.line}")
+        return value
+
+    def _eval_code(self, node: Node) -> Any:
+        code = node._code
+        if code is None:
+            code = node._code = self.compile(node)
+            if self._specialize(node, code):
+                return self._eval_float_pair(node)
+        return self._run_code(code)
+
+    def _run_code(self, code: List[tuple]) -> Any:
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        scopes = self.scopes
+        for op, arg in code:
+            if op == OP_LOAD:
+                value = scopes[-1].get(arg.name, MISSING)
+                if value is MISSING:
+                    value = self._find(arg.name)
+                    if value is MISSING:
+                        raise Exception(f"Access to undefined or deleted variable '{arg.name}' at line {arg.line}")
+                push(value)
+            elif op == OP_CONST:
+                push(arg)
+            elif op == OP_BINOP:
+                fn, node = arg
+                right = pop()
+                left = pop()
+                if type(left) is float and type(right) is float:
+                    try:
+                        push(fn(left, right))
+                        continue
+                    except ArithmeticError:
+                        pass
+                push(apply_binop(node, left, right))
+            elif op == OP_COMPARE:
+                fn, node = arg
+                right = pop()
+                left = pop()
+                if type(left) is float and type(right) is float:
+                    push(fn(left, right))
+                else:
+                    push(apply_compare(node, left, right))
+            elif op == OP_LOGICAL:
+                short, right_code, node = arg
+                left = check_logical(node, pop())
+                push(left if left is short else check_logical(node, self._run_code(right_code)))
+            elif op == OP_UNARY:
+                fn, node = arg
+                operand = pop()
+                if type(operand) is float and fn is not None:
+                    push(fn(operand))
+                else:
+                    push(apply_unary(node, operand))
+            else:
+                push(self.evaluate(arg))
+        return stack[-1]
+
+    def _specialize(self, node: Node, code: List[tuple]) -> bool:
+        # `a op b` over variables and number literals is assumed to stay
+        # float-only and gets its own handler; the first operand of any other
+        # type drops the node back to _eval_code for good
+        if len(code) != 3 or code[2][0] not in (OP_BINOP, OP_COMPARE):
+            return False
+        operands = []
+        for op, arg in code[:2]:
+            if op == OP_LOAD:
+                operands += [arg.name, arg]
+            elif op == OP_CONST and type(arg) is float:
+                operands += [None, arg]
+            else:
+                return False
+        fn = code[2][1][0]
+        node._fast = (*operands, fn)
+        node._eval = Interpreter._eval_float_pair
+        return True
+
+    def _eval_float_pair(self, node: Node) -> Any:
+        left_name, left, right_name, right, fn = node._fast
+        if left_name is not None or right_name is not None:
+            scope = self.scopes[-1]
+            if left_name is not None:
+                value = scope.get(left_name, MISSING)
+                if value is MISSING:
+                    value = self._find(left_name)
+                    if value is MISSING:
+                        raise Exception(f"Access to undefined or deleted variable '{left_name}' at line {left.line}")
+                left = value
+            if right_name is not None:
+                value = scope.get(right_name, MISSING)
+                if value is MISSING:
+                    value = self._find(right_name)
+                    if value is MISSING:
+                        raise Exception(f"Access to undefined or deleted variable '{right_name}' at line {right.line}")
+                right = value
+        if type(left) is float and type(right) is float:
+            try:
+                return fn(left, right)
+            except ArithmeticError:
+                # Only binary arithmetic can fail here; report it the usual way
+                return apply_binop(node, left, right)
+        node._eval = Interpreter._eval_code
+        return self._eval_code(node)
+
+    def compile(self, node: Node) -> List[tuple]:
+        code = []
+        self._emit(node, code)
+        return code
+
+    def _emit(self, node: Node, code: List[tuple]):
         if isinstance(node, NumberNode):
-            return float(node.value)
-        elif isinstance(node, StringNode):
-            return node.value
-        elif isinstance(node, BoolNode):
-            return node.value
+            code.append((OP_CONST, node.value))
+        elif isinstance(node, (StringNode, BoolNode)):
+            code.append((OP_CONST, node.value))
         elif isinstance(node, NullNode):
-            return None
+            code.append((OP_CONST, None))
         elif isinstance(node, VarNode):
-            if node.name not in self.variables or self.variables[node.name].get('deleted', False):
-                raise Exception(f"Access to undefined or deleted variable '{node.name}' at line {node.line}")
-            return self.variables[node.name]['value']
+            code.append((OP_LOAD, node))
         elif isinstance(node, BinOpNode):
-            left = self.evaluate(node.left)
-            right = self.evaluate(node.right)
-            if node.op == TokenType.PLUS:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left + right
-                elif isinstance(left, str) and isinstance(right, str):
-                    return left + right
-                raise Exception(f"Type mismatch in '+' operation at line {node.line}")
-            elif node.op == TokenType.MINUS:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left - right
-                raise Exception(f"Type mismatch in '-' operation at line {node.line}")
-            elif node.op == TokenType.MULTIPLY:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left * right
-                raise Exception(f"Type mismatch in '*' operation at line {node.line}")
-            elif node.op == TokenType.DIVIDE:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    if right == 0:
-                        raise Exception(f"Division by zero at line {node.line}")
-                    return left / right
-                raise Exception(f"Type mismatch in '/' operation at line {node.line}")
-            elif node.op == TokenType.EXPONENTIATION:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left ** right
-                raise Exception(f"Type mismatch in '^' operation at line {node.line}")
-            elif node.op == TokenType.MODULUS:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    if right == 0:
-                        raise Exception(f"Modulus by zero at line {node.line}")
-                    return left % right
-                raise Exception(f"Type mismatch in '%' operation at line {node.line}")
-        elif isinstance(node, UnaryOpNode):
-            operand = self.evaluate(node.operand)
-            if node.op == TokenType.PLUS:
-                if isinstance(operand, (int, float)):
-                    return +operand
-                raise Exception(f"Type mismatch in unary '+' operation at line {node.line}")
-            elif node.op == TokenType.MINUS:
-                if isinstance(operand, (int, float)):
-                    return -operand
-                raise Exception(f"Type mismatch in unary '-' operation at line {node.line}")
-            elif node.op == TokenType.NOT:
-                if isinstance(operand, bool):
-                    return not operand
-                raise Exception(f"Type mismatch in 'NOT' operation at line {node.line}")
-        elif isinstance(node, LogicalNode):
-            left = self.evaluate(node.left)
-            right = self.evaluate(node.right)
-            if node.op == TokenType.AND:
-                if isinstance(left, bool) and isinstance(right, bool):
-                    return left and right
-                raise Exception(f"Type mismatch in 'AND' operation at line {node.line}")
-            elif node.op == TokenType.OR:
-                if isinstance(left, bool) and isinstance(right, bool):
-                    return left or right
-                raise Exception(f"Type mismatch in 'OR' operation at line {node.line}")
+            self._emit(node.left, code)
+            self._emit(node.right, code)
+            if not self._fold(code, 2, apply_binop, node):
+                code.append((OP_BINOP, (BINOPS[node.op], node)))
         elif isinstance(node, CompareNode):
-            left = self.evaluate(node.left)
-            right = self.evaluate(node.right)
-            if node.op == TokenType.EQUAL:
-                return left == right
-            elif node.op == TokenType.NOT_EQUAL:
-                return left != right
-            elif node.op == TokenType.LESS:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left < right
-                raise Exception(f"Type mismatch in '<' operation at line {node.line}")
-            elif node.op == TokenType.GREATER:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left > right
-                raise Exception(f"Type mismatch in '>' operation at line {node.line}")
-            elif node.op == TokenType.LESS_EQUAL:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left <= right
-                raise Exception(f"Type mismatch in '<=' operation at line {node.line}")
-            elif node.op == TokenType.GREATER_EQUAL:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left >= right
-                raise Exception(f"Type mismatch in '>=' operation at line {node.line}")
-        elif isinstance(node, AssignNode):
-            value = self.evaluate(node.value)
-            self.variables[node.name] = {'value': value, 'deleted': False}
-            return value
-        elif isinstance(node, IfNode):
+            self._emit(node.left, code)
+            self._emit(node.right, code)
+            if not self._fold(code, 2, apply_compare, node):
+                code.append((OP_COMPARE, (COMPAREOPS[node.op], node)))
+        elif isinstance(node, LogicalNode):
+            # The right operand gets its own code, run only when the left one
+            # doesn't already decide the result
+            self._emit(node.left, code)
+            right_code = self.compile(node.right)
+            short = node.op is TokenType.OR
+            left = code[-1][1] if code[-1][0] == OP_CONST else None
+            if type(left) is bool and (left is short or (len(right_code) == 1 and right_code[0][0] == OP_CONST and type(right_code[0][1]) is bool)):
+                code[-1] = (OP_CONST, left if left is short else right_code[0][1])
+            else:
+                code.append((OP_LOGICAL, (short, right_code, node)))
+        elif isinstance(node, UnaryOpNode):
+            self._emit(node.operand, code)
+            if not self._fold(code, 1, apply_unary, node):
+                code.append((OP_UNARY, (UNARYOPS.get(node.op), node)))
+        else:
+            code.append((OP_EVAL, node))
+
+    def _fold(self, code: List[tuple], arity: int, apply, node: Node) -> bool:
+        # Replace an operator whose operands are all constants with its result;
+        # operations that fail are left in place so the error surfaces at run time
+        operands = code[-arity:]
+        if len(operands) < arity or any(op != OP_CONST for op, _ in operands):
+            return False
+        try:
+            value = apply(node, *[arg for _, arg in operands])
+        except Exception:
+            return False
+        del code[-arity:]
+        code.append((OP_CONST, value))
+        return True
+
+    def _eval_assign(self, node: AssignNode) -> Any:
+        value = self.evaluate(node.value)
+        self.scopes[-1][node.name] = value
+        return value
+
+    def _eval_if(self, node: IfNode) -> Any:
+        condition = self.evaluate(node.condition)
+        if not isinstance(condition, bool):
+            raise Exception(f"Condition must be boolean at line {node.line}")
+        if condition:
+            return self.evaluate(node.then_block)
+        elif node.else_block is not None:
+            return self.evaluate(node.else_block)
+        return None
+
+    def _eval_for(self, node: ForNode) -> Any:
+        self.evaluate(node.init)
+        counter = node._counter
+        if counter is None:
+            counter = node._counter = self._match_counter(node)
+        if counter and not self.verbose:
+            return self._run_counter(node, counter)
+        while self.evaluate(node.condition):
+            self.evaluate(node.body)
+            self.evaluate(node.update)
+        return None
+
+    def _match_counter(self, node: ForNode) -> Any:
+        # Recognises `i < limit; i = i + step` where limit is a variable or a
+        # number and step a number; anything else runs the generic loop
+        condition, update = node.condition, node.update
+        if not (type(condition) is CompareNode and condition.op in COMPAREOPS and type(condition.left) is VarNode):
+            return False
+        name = condition.left.name
+        if type(update) is not AssignNode or update.name != name:
+            return False
+        step = update.value
+        if not (type(step) is BinOpNode and step.op in (TokenType.PLUS, TokenType.MINUS)
+                and type(step.left) is VarNode and step.left.name == name and type(step.right) is NumberNode):
+            return False
+        limit = condition.right
+        if type(limit) is VarNode:
+            limit_name, limit = limit.name, None
+        elif type(limit) is NumberNode:
+            limit_name, limit = None, limit.value
+        else:
+            return False
+        delta = step.right.value if step.op is TokenType.PLUS else -step.right.value
+        return (name, COMPAREOPS[condition.op], limit_name, limit, delta)
+
+    def _run_counter(self, node: ForNode, counter: tuple) -> Any:
+        # Runs the counting loop without dispatching the condition and update
+        # each iteration; reads and writes still go through the current scope,
+        # and any non-float state falls back to evaluating them normally
+        name, compare, limit_name, limit, delta = counter
+        scope = self.scopes[-1]
+        body = node.body
+        evaluate = self.evaluate
+        while True:
+            value = scope.get(name)
+            if limit_name is not None:
+                limit = scope.get(limit_name, MISSING)
+                if limit is MISSING:
+                    limit = self._find(limit_name)
+            if type(value) is float and type(limit) is float:
+                if not compare(value, limit):
+                    return None
+            elif not evaluate(node.condition):
+                return None
+            evaluate(body)
+            value = scope.get(name)
+            if type(value) is float:
+                scope[name] = value + delta
+            else:
+                evaluate(node.update)
+
+    def _eval_while(self, node: WhileNode) -> Any:
+        while True:
             condition = self.evaluate(node.condition)
             if not isinstance(condition, bool):
                 raise Exception(f"Condition must be boolean at line {node.line}")
-            if condition:
-                return self.evaluate(node.then_block)
-            elif node.else_block:
-                return self.evaluate(node.else_block)
-            return None
-        elif isinstance(node, ForNode):
-            self.evaluate(node.init)
-            while self.evaluate(node.condition):
-                result = self.evaluate(node.body)
-                if isinstance(result, ReturnNode):
-                    return self.evaluate(result.expr) if result.expr else None
-                self.evaluate(node.update)
-            return None
-        elif isinstance(node, WhileNode):
-            while True:
-                condition = self.evaluate(node.condition)
-                if not isinstance(condition, bool):
-                    raise Exception(f"Condition must be boolean at line {node.line}")
-                if not condition:
-                    break
-                result = self.evaluate(node.body)
-                if isinstance(result, ReturnNode):
-                    return self.evaluate(result.expr) if result.expr else None
-            return None
-        elif isinstance(node, BlockNode):
-            for stmt in node.statements:
-                result = self.evaluate(stmt)
-                if isinstance(result, ReturnNode):
-                    return self.evaluate(result.expr) if result.expr else None
-                if result is not None:
-                    return result
-            return None
-        elif isinstance(node, FunctionCallNode):
-            fname = node.fname
-            args = [self.evaluate(arg) for arg in node.args]
-            if self.verbose:
-                logging.debug(f"Calling function: {fname}, args: {args} at line {node.line}")
-            if fname in self.structs:
-                struct_def = self.structs[fname]
-                if len(args) == 0 and len(struct_def.fields) > 0:
-                    fields = {field: None for field in struct_def.fields}
-                elif len(struct_def.fields) != len(args):
-                    raise Exception(f"Struct '{fname}' expects {len(struct_def.fields)} fields, got {len(args)} at line {node.line}")
-                else:
-                    fields = {field: float(arg) if isinstance(arg, (int, float)) else arg for field, arg in zip(struct_def.fields, args)}
-                return StructInstance(fname, fields)
-            if '.' in fname:
-                obj_name, method_name = fname.split('.')
-                if obj_name not in self.variables:
-                    raise Exception(f"Undefined object '{obj_name}' at line {node.line}")
-                obj = self.variables[obj_name]['value']
-                if not isinstance(obj, StructInstance):
-                    raise Exception(f"Variable '{obj_name}' is not a struct at line {node.line}")
-                method_key = f"{obj.struct_name}.{method_name}"
-                if method_key not in self.functions:
-                    raise Exception(f"Method '{method_name}' not found in struct '{obj.struct_name}' at line {node.line}")
-                func = self.functions[method_key]
-                if len(func.params) != len(args):
-                    raise Exception(f"Method '{method_name}' expects {len(func.params)} arguments, got {len(args)} at line {node.line}")
-                saved_vars = self.variables.copy()
-                for param, arg in zip(func.params, args):
-                    self.variables[param] = {'value': arg, 'deleted': False}
-                self.variables[obj_name] = {'value': obj, 'deleted': False}
-                result = self.evaluate(func.body)
-                self.variables = saved_vars
-                if isinstance(result, ReturnNode):
-                    return self.evaluate(result.expr) if result.expr else None
-                return result if result is not None else None
-            if fname not in self.functions:
-                if fname in self.variables and callable(self.variables[fname]['value']):
-                    func = self.variables[fname]['value']
-                    return func(*args)
-                raise Exception(f"Undefined function '{fname}' at line {node.line}")
-            func = self.functions[fname]
-            if len(func.params) != len(args):
-                raise Exception(f"Function '{fname}' expects {len(func.params)} arguments, got {len(args)} at line {node.line}")
-            saved_vars = self.variables.copy()
-            for param, arg in zip(func.params, args):
-                self.variables[param] = {'value': arg, 'deleted': False}
-            result = self.evaluate(func.body)
-            self.variables = saved_vars
-            if isinstance(result, ReturnNode):
-                return self.evaluate(result.expr) if result.expr else None
-            return result if result is not None else None
-        elif isinstance(node, FunctionDefNode):
-            self.functions[node.fname] = Function(node.params, node.body)
-            return None
-        elif isinstance(node, StructDefNode):
-            self.structs[node.struct_name] = StructDef(node.fields)
+            if not condition:
+                break
+            self.evaluate(node.body)
+        return None
+
+    def _eval_block(self, node: BlockNode) -> Any:
+        result = None
+        for stmt in node.statements:
+            result = self.evaluate(stmt)
+        return result
+
+    def _eval_call(self, node: FunctionCallNode) -> Any:
+        args = [self.evaluate(arg) for arg in node.args]
+        if self.verbose:
+            logging.debug(f"Calling function: {node.fname}, args: {args} at line {node.line}")
+        target = node._target
+        if target is None or target[0] is not self.functions or target[1] != _call_generation:
+            target = self._resolve_call(node)
+            if target is None:
+                value = self._find(node.fname)
+                if type(value) is LambdaNode:
+                    return self._call_lambda(value, args)
+                raise Exception(f"Undefined function '{node.fname}' at line {node.line}")
+            node._target = target
+        return target[2](self, node, args, target[3])
+
+    def _resolve_call(self, node: FunctionCallNode) -> Optional[tuple]:
+        # Call sites cache what their name refers to until a function or struct
+        # is (re)defined; lambda variables are looked up on every call
+        fname = node.fname
+        if fname in self.structs:
+            return (self.functions, _call_generation, Interpreter._construct_struct, self.structs[fname])
+        if '.' in fname:
+            obj_name, method_name = fname.split('.')
+            return (self.functions, _call_generation, Interpreter._call_method, (obj_name, method_name, {}))
+        func = self.functions.get(fname)
+        if func is None:
             return None
-        elif isinstance(node, LambdaNode):
-            def lambda_func(*args):
-                if len(node.params) != len(args):
-                    raise Exception(f"Lambda expects {len(node.params)} arguments, got {len(args)} at line {node.line}")
-                saved_vars = self.variables.copy()
-                for param, arg in zip(node.params, args):
-                    self.variables[param] = {'value': arg, 'deleted': False}
-                result = self.evaluate(node.body)
-                self.variables = saved_vars
-                if isinstance(result, ReturnNode):
-                    return self.evaluate(result.expr) if result.expr else None
-                return result
-            return lambda_func
-        elif isinstance(node, ArrayNode):
-            return [self.evaluate(elem) for elem in node.elements]
-        elif isinstance(node, StructInitNode):
-            if node.struct_name not in self.structs:
-                raise Exception(f"Undefined struct '{node.struct_name}' at line {node.line}")
-            struct_def = self.structs[node.struct_name]
-            args = [self.evaluate(arg) for arg in node.args]
-            if self.verbose:
-                logging.debug(f"Initializing struct {node.struct_name} with args: {args} at line {node.line}")
-            if len(args) == 0 and len(struct_def.fields) > 0:
-                fields = {field: None for field in struct_def.fields}
-            elif len(struct_def.fields) != len(args):
-                raise Exception(f"Struct '{node.struct_name}' expects {len(struct_def.fields)} fields, got {len(args)} at line {node.line}")
-            else:
-                fields = {field: float(arg) if isinstance(arg, (int, float)) else arg for field, arg in zip(struct_def.fields, args)}
-            return StructInstance(node.struct_name, fields)
-        elif isinstance(node, FieldAccessNode):
-            if self.verbose:
-                logging.debug(f"Accessing field: {node.obj_name}.{node.field} at line {node.line}")
-            if node.obj_name not in self.variables:
-                raise Exception(f"Undefined variable '{node.obj_name}' at line {node.line}")
-            obj = self.variables[node.obj_name]['value']
-            if not isinstance(obj, StructInstance):
-                raise Exception(f"Variable '{node.obj_name}' is not a struct at line {node.line}")
-            if node.field not in obj.fields:
+        return (self.functions, _call_generation, Interpreter._call_function, (func.body, tuple(func.params)))
+
+    def _call_function(self, node: FunctionCallNode, args: List[Any], target: tuple) -> Any:
+        body, params = target
+        if len(params) != len(args):
+            raise Exception(f"Function '{node.fname}' expects {len(params)} arguments, got {len(args)} at line {node.line}")
+        return self._call(body, dict(zip(params, args)))
+
+    def _construct_struct(self, node: FunctionCallNode, args: List[Any], struct_def: StructDef) -> Any:
+        if len(args) == 0 and len(struct_def.fields) > 0:
+            values = [None] * len(struct_def.fields)
+        elif len(struct_def.fields) != len(args):
+            raise Exception(f"Struct '{node.fname}' expects {len(struct_def.fields)} fields, got {len(args)} at line {node.line}")
+        else:
+            values = [float(arg) if isinstance(arg, (int, float)) else arg for arg in args]
+        return StructInstance(node.fname, struct_def, values)
+
+    def _call_method(self, node: FunctionCallNode, args: List[Any], target: tuple) -> Any:
+        obj_name, method_name, methods = target
+        obj = self._find(obj_name)
+        if obj is MISSING:
+            raise Exception(f"Undefined object '{obj_name}' at line {node.line}")
+        if not isinstance(obj, StructInstance):
+            raise Exception(f"Variable '{obj_name}' is not a struct at line {node.line}")
+        func = methods.get(obj.struct_name)
+        if func is None:
+            method_key = f"{obj.struct_name}.{method_name}"
+            if method_key not in self.functions:
+                raise Exception(f"Method '{method_name}' not found in struct '{obj.struct_name}' at line {node.line}")
+            func = methods[obj.struct_name] = self.functions[method_key]
+        if len(func.params) != len(args):
+            raise Exception(f"Method '{method_name}' expects {len(func.params)} arguments, got {len(args)} at line {node.line}")
+        frame = dict(zip(func.params, args))
+        frame[obj_name] = obj
+        return self._call(func.body, frame)
+
+    def _eval_function_def(self, node: FunctionDefNode) -> Any:
+        global _call_generation
+        _call_generation += 1
+        self.functions[node.fname] = Function(node.params, node.body)
+        return None
+
+    def _eval_struct_def(self, node: StructDefNode) -> Any:
+        global _call_generation
+        _call_generation += 1
+        self.structs[node.struct_name] = StructDef(node.fields)
+        return None
+
+    def _eval_lambda(self, node: LambdaNode) -> Any:
+        # A lambda value is its node; whichever interpreter calls it runs the
+        # body, so calls from a parallel block use that block's scope stack
+        return node
+
+    def _call_lambda(self, node: LambdaNode, args: List[Any]) -> Any:
+        if len(node.params) != len(args):
+            raise Exception(f"Lambda expects {len(node.params)} arguments, got {len(args)} at line {node.line}")
+        return self._call(node.body, dict(zip(node.params, args)))
+
+    def _eval_array(self, node: ArrayNode) -> Any:
+        return [self.evaluate(elem) for elem in node.elements]
+
+    def _eval_struct_init(self, node: StructInitNode) -> Any:
+        if node.struct_name not in self.structs:
+            raise Exception(f"Undefined struct '{node.struct_name}' at line {node.line}")
+        struct_def = self.structs[node.struct_name]
+        args = [self.evaluate(arg) for arg in node.args]
+        if self.verbose:
+            logging.debug(f"Initializing struct {node.struct_name} with args: {args} at line {node.line}")
+        if len(args) == 0 and len(struct_def.fields) > 0:
+            values = [None] * len(struct_def.fields)
+        elif len(struct_def.fields) != len(args):
+            raise Exception(f"Struct '{node.struct_name}' expects {len(struct_def.fields)} fields, got {len(args)} at line {node.line}")
+        else:
+            values = [float(arg) if isinstance(arg, (int, float)) else arg for arg in args]
+        return StructInstance(node.struct_name, struct_def, values)
+
+    def _eval_field_access(self, node: FieldAccessNode) -> Any:
+        if self.verbose:
+            logging.debug(f"Accessing field: {node.obj_name}.{node.field} at line {node.line}")
+        obj = self._find(node.obj_name)
+        if obj is MISSING:
+            raise Exception(f"Undefined variable '{node.obj_name}' at line {node.line}")
+        if not isinstance(obj, StructInstance):
+            raise Exception(f"Variable '{node.obj_name}' is not a struct at line {node.line}")
+        struct_def, index = node._index or (None, None)
+        if struct_def is not obj.struct_def:
+            index = obj.struct_def.field_index.get(node.field)
+            if index is None:
                 raise Exception(f"Field '{node.field}' not found in struct '{obj.struct_name}' at line {node.line}")
-            value = obj.fields[node.field]
-            if self.verbose:
-                logging.debug(f"Field value: {value} at line {node.line}")
-            return float(value) if isinstance(value, (int, float)) else value
-        elif isinstance(node, PrintNode):
-            value = self.evaluate(node.expr)
-            self.printed_values.append(str(value))
+            node._index = (obj.struct_def, index)
+        value = obj.values[index]
+        if self.verbose:
+            logging.debug(f"Field value: {value} at line {node.line}")
+        return float(value) if isinstance(value, (int, float)) else value
+
+    def _eval_print(self, node: PrintNode) -> Any:
+        value = self.evaluate(node.expr)
+        if self.print_sink is not None:
+            self.print_sink(str(value))
+            self.streamed = True
             return value
-        elif isinstance(node, DeleteNode):
-            if node.var_name in self.variables:
-                self.variables[node.var_name]['deleted'] = True
-            return None
-        elif isinstance(node, ParallelNode):
-            executor = ParallelExecutor(self, node.block)
-            with ThreadPoolExecutor() as pool:
-                pool.submit(executor.execute)
+        # Immutable values are stringified when read back; anything else is
+        # snapshotted now so later field writes don't change what was printed
+        self.printed_values.append(value if type(value) in DEFERRED_PRINT_TYPES else str(value))
+        return value
+
+    def _eval_delete(self, node: DeleteNode) -> Any:
+        for scope in reversed(self.scopes):
+            if node.var_name in scope:
+                del scope[node.var_name]
+                break
+        return None
+
+    def _eval_parallel(self, node: ParallelNode) -> Any:
+        executors = [ParallelExecutor(self, block) for block in node.blocks]
+        if on_pool_thread():
+            # Nested parallel blocks run inline rather than waiting on the pool
+            # from one of its own workers
+            for executor in executors:
+                executor.execute()
             return None
-        elif isinstance(node, InputNode):
-            if self.input_value is None:
-                raise InputRequired(node.line)
-            value = self.input_value
-            self.input_value = None
-            try:
-                return float(value)
-            except ValueError:
-                return value
-        elif isinstance(node, ReturnNode):
-            return self.evaluate(node.expr) if node.expr else None
-        raise Exception(f"Unknown node type {type(node).__name__} at line {node.line}")
\ No newline at end of file
+        pool = get_parallel_pool()
+        futures = [pool.submit(executor.execute) for executor in executors]
+        wait(futures)
+        for future in futures:
+            future.result()
+        return None
+
+    def _eval_input(self, node: InputNode) -> Any:
+        # A block can't pause for input: it would consume a copy of the
+        # pending value, and resuming would rerun its sibling blocks
+        if on_pool_thread():
+            raise Exception(f"input() is not allowed inside a parallel block at line {node.line}")
+        if self.input_value is None:
+            raise InputRequired(node.line)
+        value = self.input_value
+        self.input_value = None
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+    def _eval_return(self, node: ReturnNode) -> Any:
+        value = self.evaluate(node.expr) if node.expr is not None else None
+        if node.tail or len(self.scopes) == 1:
+            # A return ending the function body, or at top level, is already
+            # the last statement, so its value can be the block result
+            return value
+        raise ReturnValue(value)
+
+    _dispatch = {
+        NumberNode: _eval_number,
+        StringNode: _eval_literal,
+        BoolNode: _eval_literal,
+        NullNode: _eval_null,
+        VarNode: _eval_var,
+        BinOpNode: _eval_code,
+        UnaryOpNode: _eval_code,
+        LogicalNode: _eval_code,
+        CompareNode: _eval_code,
+        AssignNode: _eval_assign,
+        IfNode: _eval_if,
+        ForNode: _eval_for,
+        WhileNode: _eval_while,
+        BlockNode: _eval_block,
+        FunctionCallNode: _eval_call,
+        FunctionDefNode: _eval_function_def,
+        StructDefNode: _eval_struct_def,
+        LambdaNode: _eval_lambda,
+        ArrayNode: _eval_array,
+        StructInitNode: _eval_struct_init,
+        FieldAccessNode: _eval_field_access,
+        PrintNode: _eval_print,
+        DeleteNode: _eval_delete,
+        ParallelNode: _eval_parallel,
+        InputNode: _eval_input,
+        ReturnNode: _eval_return,
+    }
\ No newline at end of file
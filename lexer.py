@@ -1,10 +1,81 @@
+from typing import List
 from tokens import Token
 from token_type import TokenType
 import logging
+import re
+import sys
+
+WHITESPACE = re.compile(r'\s+')
+# \w is exactly str.isalnum() or '_', Unicode included
+IDENTIFIER_TAIL = re.compile(r'\w*')
+
+# One match consumes any leading whitespace/comments plus the next token
+TOKEN_PATTERN = re.compile(r'''
+    (?:\s+|//[^\n]*(?:\n|\Z))*
+    (?:
+        (?P<NUMBER>-?[0-9][0-9.]*)
+      | (?P<STRING>"[^"]*"|'[^']*')
+      | (?P<ID>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<OP>==|!=|<=|>=|->|/(?!/)|[-=+*^%<>(){}.,;])
+    )
+''', re.VERBOSE)
+
+KEYWORDS = {
+    'if': TokenType.IF,
+    'else': TokenType.ELSE,
+    'for': TokenType.FOR,
+    'while': TokenType.WHILE,
+    'def': TokenType.DEF,
+    'return': TokenType.RETURN,
+    'struct': TokenType.STRUCT,
+    'class': TokenType.CLASS,
+    'print': TokenType.PRINT,
+    'true': TokenType.TRUE,
+    'false': TokenType.FALSE,
+    'and': TokenType.AND,
+    'or': TokenType.OR,
+    'not': TokenType.NOT,
+    'null': TokenType.NULL,
+    'delete': TokenType.DELETE,
+    'parallel': TokenType.PARALLEL,
+    'input': TokenType.INPUT,
+}
+
+SINGLE_CHAR_TOKENS = {
+    '=': TokenType.ASSIGN,
+    '+': TokenType.PLUS,
+    '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE,
+    '^': TokenType.EXPONENTIATION,
+    '%': TokenType.MODULUS,
+    '<': TokenType.LESS,
+    '>': TokenType.GREATER,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    '.': TokenType.DOT,
+    ',': TokenType.COMMA,
+    ';': TokenType.SEMICOLON,
+}
+
+OPERATORS = {
+    '==': TokenType.EQUAL,
+    '!=': TokenType.NOT_EQUAL,
+    '<=': TokenType.LESS_EQUAL,
+    '>=': TokenType.GREATER_EQUAL,
+    '->': TokenType.ARROW,
+    '-': TokenType.MINUS,
+    **SINGLE_CHAR_TOKENS,
+}
 
 class Lexer:
     def __init__(self, text: str):
         self.text = text
+        self.length = len(text)
+        # TOKEN_PATTERN's classes match str.isdigit/isalpha/isalnum only for ASCII
+        self.ascii = text.isascii()
+        self.words = {}
         self.pos = 0
         self.line = 1
         self.column = 1
@@ -16,37 +87,49 @@ class Lexer:
             self.column = 0
         self.pos += 1
         self.column += 1
-        self.current_char = self.text[self.pos] if self.pos < len(self.text) else None
+        self.current_char = self.text[self.pos] if self.pos < self.length else None
 
     def skip_whitespace(self):
-        while self.current_char is not None and self.current_char.isspace():
-            self.advance()
+        match = WHITESPACE.match(self.text, self.pos)
+        if match:
+            self._jump(match.end())
 
     def skip_comment(self):
-        while self.current_char is not None and self.current_char != '\n':
-            self.advance()
-        if self.current_char == '\n':
-            self.advance()
+        end = self.text.find('\n', self.pos)
+        self._jump(self.length if end == -1 else end + 1)
+
+    def _jump(self, pos: int):
+        # Move straight to pos, keeping line/column as advance() would
+        newlines = self.text.count('\n', self.pos, pos)
+        if newlines:
+            self.line += newlines
+            self.column = pos - self.text.rfind('\n', self.pos, pos)
+        else:
+            self.column += pos - self.pos
+        self.pos = pos
+        self.current_char = self.text[pos] if pos < self.length else None
 
     def get_number(self):
-        result = ''
+        text = self.text
+        start = pos = self.pos
         has_dot = False
         start_line = self.line
         start_column = self.column
 
         # Handle optional leading minus
         if self.current_char == '-':
-            result += self.current_char
-            self.advance()
+            pos += 1
 
         # Collect digits and at most one dot
-        while self.current_char is not None and (self.current_char.isdigit() or self.current_char == '.'):
-            if self.current_char == '.':
+        while pos < self.length and (text[pos].isdigit() or text[pos] == '.'):
+            if text[pos] == '.':
                 if has_dot:
+                    self._jump(pos)
                     raise Exception(f"Invalid number format: multiple dots at line {self.line}, column {self.column}")
                 has_dot = True
-            result += self.current_char
-            self.advance()
+            pos += 1
+        self._jump(pos)
+        result = text[start:pos]
 
         # Ensure the result is a valid number
         if not result or result == '-' or result == '-.' or result == '.':
@@ -58,205 +141,113 @@ class Lexer:
             raise Exception(f"Invalid number format '{result}' at line {start_line}, column {start_column}")
 
     def get_string(self):
-        result = ''
+        text = self.text
         quote_type = self.current_char  # Capture ' or "
         self.advance()  # Skip opening quote
-        while self.current_char is not None and self.current_char != quote_type:
-            result += self.current_char
-            self.advance()
+        start = self.pos
+        pos = text.find(quote_type, start)
+        if pos == -1:
+            pos = self.length
+        self._jump(pos)
         if self.current_char != quote_type:
             raise Exception(f"Unterminated string at line {self.line}, column {self.column}")
         self.advance()  # Skip closing quote
-        return result
+        return text[start:pos]
 
     def get_id(self):
-        result = ''
-        while self.current_char is not None and (self.current_char.isalnum() or self.current_char == '_'):
-            result += self.current_char
-            self.advance()
-        return result
+        start = self.pos
+        pos = IDENTIFIER_TAIL.match(self.text, start).end()
+        self._jump(pos)
+        return self.text[start:pos]
+
+    def _token(self, token_type: TokenType, value) -> Token:
+        token = Token(token_type, value, self.line, self.column)
+        # Checked per token so Token.__str__ only runs when debug output is on
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug("Token: %s", token)
+        return token
+
+    def _emit(self, token_type: TokenType, value: str) -> Token:
+        self._jump(self.pos + len(value))
+        return self._token(token_type, value)
+
+    def _word_token(self, value: str) -> Token:
+        # Each distinct word is classified once; repeats are a single dict probe
+        word = self.words.get(value)
+        if word is None:
+            token_type = KEYWORDS.get(value.lower(), TokenType.ID)  # Case-insensitive comparison
+            if token_type is TokenType.ID:
+                # Interned so scope lookups for the same name hit on identity
+                word = (TokenType.ID, sys.intern(value))
+            else:
+                word = (token_type, None if token_type is TokenType.NULL else value)
+            self.words[value] = word
+        return self._token(*word)
 
     def get_next_token(self):
+        if not self.ascii:
+            return self._scan_chars()
+        match = TOKEN_PATTERN.match(self.text, self.pos)
+        # End of input, errors and numbers with several dots are left to the
+        # character scanner, which raises the detailed messages
+        if match is None:
+            return self._scan_chars()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'NUMBER' and value.count('.') > 1:
+            return self._scan_chars()
+        self._jump(match.end())
+        if kind == 'OP':
+            return self._token(OPERATORS[value], value)
+        if kind == 'ID':
+            return self._word_token(value)
+        if kind == 'NUMBER':
+            return self._token(TokenType.NUMBER, float(value))
+        return self._token(TokenType.STRING, value[1:-1])
+
+    def tokenize(self) -> List[Token]:
+        # Lexes the whole source up front; the list always ends with EOF
+        tokens = []
+        append = tokens.append
+        next_token = self.get_next_token
+        while True:
+            token = next_token()
+            append(token)
+            if token.type is TokenType.EOF:
+                return tokens
+
+    def _scan_chars(self):
         while self.current_char is not None:
             self.skip_whitespace()
 
             if self.current_char is None:
                 break
 
-            if self.current_char == '/' and self.pos + 1 < len(self.text) and self.text[self.pos + 1] == '/':
+            if self.text.startswith('//', self.pos):
                 self.advance()
                 self.advance()
                 self.skip_comment()
                 continue
 
-            if self.current_char.isdigit() or (self.current_char == '-' and self.pos + 1 < len(self.text) and self.text[self.pos + 1].isdigit()):
+            if self.current_char.isdigit() or (self.current_char == '-' and self.pos + 1 < self.length and self.text[self.pos + 1].isdigit()):
                 value = self.get_number()
-                token = Token(TokenType.NUMBER, value, self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
+                return self._token(TokenType.NUMBER, value)
 
             if self.current_char in ("'", '"'):
                 value = self.get_string()
-                token = Token(TokenType.STRING, value, self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
+                return self._token(TokenType.STRING, value)
 
             if self.current_char.isalpha() or self.current_char == '_':
-                value = self.get_id()
-                value_lower = value.lower()  # Case-insensitive comparison
-                if value_lower == 'if':
-                    token = Token(TokenType.IF, value, self.line, self.column)
-                elif value_lower == 'else':
-                    token = Token(TokenType.ELSE, value, self.line, self.column)
-                elif value_lower == 'for':
-                    token = Token(TokenType.FOR, value, self.line, self.column)
-                elif value_lower == 'while':
-                    token = Token(TokenType.WHILE, value, self.line, self.column)
-                elif value_lower == 'def':
-                    token = Token(TokenType.DEF, value, self.line, self.column)
-                elif value_lower == 'return':
-                    token = Token(TokenType.RETURN, value, self.line, self.column)
-                elif value_lower == 'struct':
-                    token = Token(TokenType.STRUCT, value, self.line, self.column)
-                elif value_lower == 'class':
-                    token = Token(TokenType.CLASS, value, self.line, self.column)
-                elif value_lower == 'print':
-                    token = Token(TokenType.PRINT, value, self.line, self.column)
-                elif value_lower == 'true':
-                    token = Token(TokenType.TRUE, value, self.line, self.column)
-                elif value_lower == 'false':
-                    token = Token(TokenType.FALSE, value, self.line, self.column)
-                elif value_lower == 'and':
-                    token = Token(TokenType.AND, value, self.line, self.column)
-                elif value_lower == 'or':
-                    token = Token(TokenType.OR, value, self.line, self.column)
-                elif value_lower == 'not':
-                    token = Token(TokenType.NOT, value, self.line, self.column)
-                elif value_lower == 'null':
-                    token = Token(TokenType.NULL, None, self.line, self.column)
-                elif value_lower == 'delete':
-                    token = Token(TokenType.DELETE, value, self.line, self.column)
-                elif value_lower == 'parallel':
-                    token = Token(TokenType.PARALLEL, value, self.line, self.column)
-                elif value_lower == 'input':
-                    token = Token(TokenType.INPUT, value, self.line, self.column)
-                else:
-                    token = Token(TokenType.ID, value, self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
+                return self._word_token(self.get_id())
 
-            if self.current_char == '=' and self.pos + 1 < len(self.text) and self.text[self.pos + 1] == '=':
-                self.advance()
-                self.advance()
-                token = Token(TokenType.EQUAL, '==', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '!' and self.pos + 1 < len(self.text) and self.text[self.pos + 1] == '=':
-                self.advance()
-                self.advance()
-                token = Token(TokenType.NOT_EQUAL, '!=', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '<' and self.pos + 1 < len(self.text) and self.text[self.pos + 1] == '=':
-                self.advance()
-                self.advance()
-                token = Token(TokenType.LESS_EQUAL, '<=', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '>' and self.pos + 1 < len(self.text) and self.text[self.pos + 1] == '=':
-                self.advance()
-                self.advance()
-                token = Token(TokenType.GREATER_EQUAL, '>=', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '-':
-                self.advance()
-                if self.current_char == '>':
-                    self.advance()
-                    token = Token(TokenType.ARROW, '->', self.line, self.column)
-                    logging.debug(f"Token: {token}")
-                    return token
-                token = Token(TokenType.MINUS, '-', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '=':
-                self.advance()
-                token = Token(TokenType.ASSIGN, '=', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '+':
-                self.advance()
-                token = Token(TokenType.PLUS, '+', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '*':
-                self.advance()
-                token = Token(TokenType.MULTIPLY, '*', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '/':
-                self.advance()
-                token = Token(TokenType.DIVIDE, '/', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '^':
-                self.advance()
-                token = Token(TokenType.EXPONENTIATION, '^', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '%':
-                self.advance()
-                token = Token(TokenType.MODULUS, '%', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '<':
-                self.advance()
-                token = Token(TokenType.LESS, '<', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '>':
-                self.advance()
-                token = Token(TokenType.GREATER, '>', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '(':
-                self.advance()
-                token = Token(TokenType.LPAREN, '(', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == ')':
-                self.advance()
-                token = Token(TokenType.RPAREN, ')', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '{':
-                self.advance()
-                token = Token(TokenType.LBRACE, '{', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '}':
-                self.advance()
-                token = Token(TokenType.RBRACE, '}', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == '.':
-                self.advance()
-                token = Token(TokenType.DOT, '.', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == ',':
-                self.advance()
-                token = Token(TokenType.COMMA, ',', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
-            if self.current_char == ';':
-                self.advance()
-                token = Token(TokenType.SEMICOLON, ';', self.line, self.column)
-                logging.debug(f"Token: {token}")
-                return token
+            operator = self.text[self.pos:self.pos + 2]
+            token_type = OPERATORS.get(operator)
+            if token_type is None:
+                operator = self.current_char
+                token_type = OPERATORS.get(operator)
+            if token_type is not None:
+                return self._emit(token_type, operator)
 
             raise Exception(f"Invalid character '{self.current_char}' at line {self.line}, column {self.column}")
 
-        token = Token(TokenType.EOF, None, self.line, self.column)
-        logging.debug(f"Token: {token}")
-        return token
\ No newline at end of file
+        return self._token(TokenType.EOF, None)
\ No newline at end of file
@@ -9,6 +9,7 @@
               | <for_stmt>
               | <function_def>
               | <struct_def>
+              | <parallel_stmt>
               | <expr>
 
 <assign_stmt> ::= <id> "=" <logical_expr>
@@ -19,6 +20,8 @@
 
 <for_stmt> ::= "FOR" "(" <assign_stmt> ";" <logical_expr> ";" <assign_stmt> ")" "{" <statement_list> "}"
 
+<parallel_stmt> ::= "PARALLEL" "{" <statement_list> "}" ("AND" "{" <statement_list> "}")*
+
 <function_def> ::= "DEF" <id> "(" <param_list> ")" "RETURN" <logical_expr>
                  | "DEF" <id> "(" <param_list> ")" "{" "RETURN" <logical_expr> (";" | ε) "}"
 
@@ -83,13 +86,56 @@ from flask import Flask, request, jsonify, render_template
 from lexer import Lexer
 from parser import Parser
 from interpreter import Interpreter, InputRequired
-from nodes import AssignNode
+from collections import OrderedDict
+from functools import lru_cache
+import os
+import threading
+import time
 import uuid
 
 app = Flask(__name__)
 
+# Paused sessions (waiting on input) are kept least recently used first;
+# abandoned ones are dropped once they expire or the store is full
+MAX_SESSIONS = 256
+SESSION_TTL = 600  # seconds
+
 # Store interpreter states by session ID
-interpreter_states = {}
+interpreter_states = OrderedDict()
+interpreter_states_lock = threading.Lock()
+
+def save_session(session_id: str, state: dict):
+    now = time.monotonic()
+    with interpreter_states_lock:
+        state['touched'] = now
+        interpreter_states[session_id] = state
+        interpreter_states.move_to_end(session_id)
+        while interpreter_states:
+            oldest = next(iter(interpreter_states.values()))
+            if len(interpreter_states) <= MAX_SESSIONS and now - oldest['touched'] <= SESSION_TTL:
+                break
+            interpreter_states.popitem(last=False)
+
+def load_session(session_id: str):
+    with interpreter_states_lock:
+        state = interpreter_states.get(session_id)
+        if state is not None and time.monotonic() - state['touched'] > SESSION_TTL:
+            del interpreter_states[session_id]
+            return None
+        return state
+
+def drop_session(session_id: str):
+    with interpreter_states_lock:
+        interpreter_states.pop(session_id, None)
+
+# Resubmitting the same program reuses its AST. The interpreter's per-node
+# caches are checked against the interpreter using them, and the parser's
+# tables are copied into each interpreter before use
+@lru_cache(maxsize=256)
+def parse_program(code: str):
+    parser = Parser(Lexer(code), verbose=False)
+    statements = parser.parse()
+    return parser, statements
 
 @app.route('/')
 def home():
@@ -106,64 +152,51 @@ def run_code():
 
     try:
         # Initialize or retrieve interpreter
-        if session_id in interpreter_states:
-            interpreter = interpreter_states[session_id]['interpreter']
-            parser = interpreter_states[session_id]['parser']
-            statements = interpreter_states[session_id]['statements']
-            current_stmt = interpreter_states[session_id].get('current_stmt', 0)
+        state = load_session(session_id)
+        if state is not None:
+            interpreter = state['interpreter']
+            parser = state['parser']
+            statements = state['statements']
+            current_stmt = state.get('current_stmt', 0)
         else:
             interpreter = Interpreter(verbose=False)
-            lexer = Lexer(code)
-            parser = Parser(lexer, verbose=False)
+            parser, statements = parse_program(code)
             # Synchronize parser and interpreter dictionaries
             interpreter.functions = parser.functions.copy()
             interpreter.structs = parser.structs.copy()
-            statements = parser.parse()
-            # Update interpreter dictionaries after parsing
-            interpreter.functions.update(parser.functions)
-            interpreter.structs.update(parser.structs)
             interpreter.variables = parser.variables.copy()
             current_stmt = 0
 
         output = []
         # Execute statements, handling input requests
-        while current_stmt < len(statements):
-            try:
-                result = interpreter.evaluate(statements[current_stmt])
-                if interpreter.printed_values:
-                    output.extend(interpreter.printed_values)
-                    interpreter.printed_values.clear()
-                elif result is not None and not isinstance(statements[current_stmt], AssignNode):
-                    output.append(result)
-                current_stmt += 1
-            except InputRequired as e:
-                # Store state and request input
-                interpreter_states[session_id] = {
-                    'interpreter': interpreter,
-                    'parser': parser,
-                    'statements': statements,
-                    'current_stmt': current_stmt
-                }
-                return jsonify({
-                    'status': 'input_required',
-                    'line': e.line,
-                    'session_id': session_id,
-                    'output': '\n'.join(str(item) for item in output)
-                })
+        try:
+            interpreter.run_statements(statements, current_stmt, output.extend)
+        except InputRequired as e:
+            # Store state and request input
+            save_session(session_id, {
+                'interpreter': interpreter,
+                'parser': parser,
+                'statements': statements,
+                'current_stmt': e.index
+            })
+            return jsonify({
+                'status': 'input_required',
+                'line': e.line,
+                'session_id': session_id,
+                'output': '\n'.join(output)
+            })
 
         # Execution complete, clean up
-        if session_id in interpreter_states:
-            del interpreter_states[session_id]
+        drop_session(session_id)
 
         return jsonify({
             'status': 'complete',
-            'output': '\n'.join(str(item) for item in output),
+            'output': '\n'.join(output),
             'session_id': session_id
         })
 
     except Exception as e:
-        if session_id in interpreter_states:
-            del interpreter_states[session_id]
+        drop_session(session_id)
         return jsonify({'error': str(e), 'session_id': session_id}), 400
 
 @app.route('/submit_input', methods=['POST'])
@@ -172,55 +205,46 @@ def submit_input():
     session_id = data.get('session_id')
     user_input = data.get('input', '')
 
-    if session_id not in interpreter_states:
+    state = load_session(session_id)
+    if state is None:
         return jsonify({'error': 'Invalid session ID'}), 400
 
     try:
         # Retrieve interpreter and set input
-        interpreter = interpreter_states[session_id]['interpreter']
+        interpreter = state['interpreter']
         interpreter.set_input(user_input)
 
         # Resume execution
-        statements = interpreter_states[session_id]['statements']
-        current_stmt = interpreter_states[session_id]['current_stmt']
-        parser = interpreter_states[session_id]['parser']
-        # Update interpreter dictionaries
-        interpreter.functions.update(parser.functions)
-        interpreter.structs.update(parser.structs)
+        statements = state['statements']
+        current_stmt = state['current_stmt']
 
         output = []
-        while current_stmt < len(statements):
-            try:
-                result = interpreter.evaluate(statements[current_stmt])
-                if interpreter.printed_values:
-                    output.extend(interpreter.printed_values)
-                    interpreter.printed_values.clear()
-                elif result is not None and not isinstance(statements[current_stmt], AssignNode):
-                    output.append(result)
-                current_stmt += 1
-            except InputRequired as e:
-                interpreter_states[session_id]['current_stmt'] = current_stmt
-                return jsonify({
-                    'status': 'input_required',
-                    'line': e.line,
-                    'session_id': session_id,
-                    'output': '\n'.join(str(item) for item in output)
-                })
+        try:
+            interpreter.run_statements(statements, current_stmt, output.extend)
+        except InputRequired as e:
+            state['current_stmt'] = e.index
+            save_session(session_id, state)
+            return jsonify({
+                'status': 'input_required',
+                'line': e.line,
+                'session_id': session_id,
+                'output': '\n'.join(output)
+            })
 
         # Execution complete, clean up
-        if session_id in interpreter_states:
-            del interpreter_states[session_id]
+        drop_session(session_id)
 
         return jsonify({
             'status': 'complete',
-            'output': '\n'.join(str(item) for item in output),
+            'output': '\n'.join(output),
             'session_id': session_id
         })
 
     except Exception as e:
-        if session_id in interpreter_states:
-            del interpreter_states[session_id]
+        drop_session(session_id)
         return jsonify({'error': str(e), 'session_id': session_id}), 400
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=8000)
\ No newline at end of file
+    # The debug reloader runs the app in a second, file-watching process;
+    # opt in with FLASK_DEBUG=1 while developing
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', threaded=True, host='0.0.0.0', port=8000)
\ No newline at end of file
@@ -1,162 +1,231 @@
+from __future__ import annotations
 from typing import Any, List, Optional
 from token_type import TokenType
 
 class Node:
+    # _eval caches the resolved handler, _code the compiled postfix code and
+    # _fast the operands of a specialized two-operand expression
+    __slots__ = ('line', '_eval', '_code', '_fast')
+    # Whether a top-level statement's value is hidden from the output
+    suppress_result = False
+
     def __init__(self, line: int):
         self.line = line
+        self._eval = None
+        self._code = None
+        self._fast = None
 
 class NumberNode(Node):
+    __slots__ = ('value',)
+
     def __init__(self, value: float, line: int):
-        super().__init__(line)
-        self.value = value
+        Node.__init__(self, line)
+        self.value = float(value)
 
 class StringNode(Node):
+    __slots__ = ('value',)
+
     def __init__(self, value: str, line: int):
-        super().__init__(line)
+        Node.__init__(self, line)
         self.value = value
 
 class BoolNode(Node):
+    __slots__ = ('value',)
+
     def __init__(self, value: bool, line: int):
-        super().__init__(line)
+        Node.__init__(self, line)
         self.value = value
 
 class NullNode(Node):
+    __slots__ = ()
+
     def __init__(self, line: int):
-        super().__init__(line)
+        Node.__init__(self, line)
 
 class VarNode(Node):
+    __slots__ = ('name',)
+
     def __init__(self, name: str, line: int):
-        super().__init__(line)
+        Node.__init__(self, line)
         self.name = name
 
 class BinOpNode(Node):
-    def __init__(self, op: TokenType, left: 'Node', right: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op: TokenType, left: Node, right: Node, line: int):
+        Node.__init__(self, line)
         self.op = op
         self.left = left
         self.right = right
 
 class UnaryOpNode(Node):
-    def __init__(self, op: TokenType, operand: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op: TokenType, operand: Node, line: int):
+        Node.__init__(self, line)
         self.op = op
         self.operand = operand
 
 class LogicalNode(Node):
-    def __init__(self, op: TokenType, left: 'Node', right: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op: TokenType, left: Node, right: Node, line: int):
+        Node.__init__(self, line)
         self.op = op
         self.left = left
         self.right = right
 
 class CompareNode(Node):
-    def __init__(self, op: TokenType, left: 'Node', right: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op: TokenType, left: Node, right: Node, line: int):
+        Node.__init__(self, line)
         self.op = op
         self.left = left
         self.right = right
 
 class AssignNode(Node):
-    def __init__(self, name: str, value: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('name', 'value')
+    suppress_result = True
+
+    def __init__(self, name: str, value: Node, line: int):
+        Node.__init__(self, line)
         self.name = name
         self.value = value
 
 class IfNode(Node):
-    def __init__(self, condition: 'Node', then_block: 'Node', else_block: Optional['Node'], line: int):
-        super().__init__(line)
+    __slots__ = ('condition', 'then_block', 'else_block')
+
+    def __init__(self, condition: Node, then_block: Node, else_block: Optional[Node], line: int):
+        Node.__init__(self, line)
         self.condition = condition
         self.then_block = then_block
         self.else_block = else_block
 
 class ForNode(Node):
-    def __init__(self, init: 'Node', condition: 'Node', update: 'Node', body: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('init', 'condition', 'update', 'body', '_counter')
+
+    def __init__(self, init: Node, condition: Node, update: Node, body: Node, line: int):
+        Node.__init__(self, line)
         self.init = init
         self.condition = condition
         self.update = update
         self.body = body
+        self._counter = None
 
 class WhileNode(Node):
-    def __init__(self, condition: 'Node', body: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition: Node, body: Node, line: int):
+        Node.__init__(self, line)
         self.condition = condition
         self.body = body
 
 class BlockNode(Node):
-    def __init__(self, statements: List['Node'], line: int):
-        super().__init__(line)
-        self.statements = statements
+    __slots__ = ('statements',)
+
+    def __init__(self, statements: List[Node], line: int):
+        Node.__init__(self, line)
+        self.statements = tuple(statements)
 
 class FunctionCallNode(Node):
-    def __init__(self, fname: str, args: List['Node'], line: int):
-        super().__init__(line)
+    __slots__ = ('fname', 'args', '_target')
+
+    def __init__(self, fname: str, args: List[Node], line: int):
+        Node.__init__(self, line)
         self.fname = fname
-        self.args = args
+        self.args = tuple(args)
+        self._target = None
 
 class FunctionDefNode(Node):
-    def __init__(self, fname: str, params: List[str], body: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('fname', 'params', 'body')
+
+    def __init__(self, fname: str, params: List[str], body: Node, line: int):
+        Node.__init__(self, line)
         self.fname = fname
-        self.params = params
+        self.params = tuple(params)
         self.body = body
 
 class LambdaNode(Node):
-    def __init__(self, params: List[str], body: 'Node', line: int):
-        super().__init__(line)
-        self.params = params
+    __slots__ = ('params', 'body')
+
+    def __init__(self, params: List[str], body: Node, line: int):
+        Node.__init__(self, line)
+        self.params = tuple(params)
         self.body = body
 
 class ArrayNode(Node):
-    def __init__(self, elements: List['Node'], line: int):
-        super().__init__(line)
-        self.elements = elements
+    __slots__ = ('elements',)
+
+    def __init__(self, elements: List[Node], line: int):
+        Node.__init__(self, line)
+        self.elements = tuple(elements)
 
 class StructInitNode(Node):
-    def __init__(self, struct_name: str, args: List['Node'], line: int):
-        super().__init__(line)
+    __slots__ = ('struct_name', 'args')
+
+    def __init__(self, struct_name: str, args: List[Node], line: int):
+        Node.__init__(self, line)
         self.struct_name = struct_name
-        self.args = args
+        self.args = tuple(args)
 
 class StructDefNode(Node):
+    __slots__ = ('struct_name', 'fields')
+
     def __init__(self, struct_name: str, fields: List[str], line: int):
-        super().__init__(line)
+        Node.__init__(self, line)
         self.struct_name = struct_name
-        self.fields = fields
+        self.fields = tuple(fields)
 
 class FieldAccessNode(Node):
+    __slots__ = ('obj_name', 'field', '_index')
+
     def __init__(self, obj_name: str, field: str, line: int):
-        super().__init__(line)
+        Node.__init__(self, line)
         self.obj_name = obj_name
         self.field = field
+        self._index = None
 
 class PrintNode(Node):
-    def __init__(self, expr: 'Node', line: int):
-        super().__init__(line)
+    __slots__ = ('expr',)
+
+    def __init__(self, expr: Node, line: int):
+        Node.__init__(self, line)
         self.expr = expr
 
 class DeleteNode(Node):
+    __slots__ = ('var_name',)
+
     def __init__(self, var_name: str, line: int):
-        super().__init__(line)
+        Node.__init__(self, line)
         self.var_name = var_name
 
 class ParallelNode(Node):
-    def __init__(self, block: 'Node', line: int):
-        super().__init__(line)
-        self.block = block
+    __slots__ = ('blocks',)
+
+    def __init__(self, blocks: List[Node], line: int):
+        Node.__init__(self, line)
+        self.blocks = tuple(blocks)
 
 class InputNode(Node):
+    __slots__ = ()
+
     def __init__(self, line: int):
-        super().__init__(line)
+        Node.__init__(self, line)
 
 class ReturnNode(Node):
-    def __init__(self, expr: Optional['Node'], line: int):
-        super().__init__(line)
+    __slots__ = ('expr', 'tail')
+
+    def __init__(self, expr: Optional[Node], line: int):
+        Node.__init__(self, line)
         self.expr = expr
+        self.tail = False
 
 class FieldAssignNode(Node):
-    def __init__(self, var_name: str, field: str, value: 'Node', line: int):
+    __slots__ = ('var_name', 'field', 'value')
+
+    def __init__(self, var_name: str, field: str, value: Node, line: int):
+        Node.__init__(self, line)
         self.var_name = var_name
         self.field = field
-        self.value = value
-        self.line = line
\ No newline at end of file
+        self.value = value
\ No newline at end of file
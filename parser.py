@@ -8,35 +8,22 @@ import logging
 
 class Parser:
     def __init__(self, lexer: Lexer, verbose: bool = False):
+        self.verbose = verbose
+        if self.verbose:
+            # Configured before lexing so the lexer's gated token log is on
+            logging.basicConfig(level=logging.DEBUG)
         self.lexer = lexer
-        self.current_token = self.lexer.get_next_token()
+        self.tokens = lexer.tokenize()
+        self.index = 0
+        self.current_token = self.tokens[0]
         self.functions: dict = {}
         self.structs: dict = {}
         self.variables: dict = {}
-        self.verbose = verbose
         if self.verbose:
-            logging.basicConfig(level=logging.DEBUG)
             self.log_token_stream()
 
     def log_token_stream(self):
-        tokens = []
-        temp_pos = self.lexer.pos
-        temp_line = self.lexer.line
-        temp_column = self.lexer.column
-        temp_char = self.lexer.current_char
-        temp_token = self.current_token
-
-        while temp_token.type != TokenType.EOF:
-            tokens.append(temp_token)
-            temp_token = self.lexer.get_next_token()
-
-        logging.debug(f"Token Stream: {tokens}")
-
-        self.lexer.pos = temp_pos
-        self.lexer.line = temp_line
-        self.lexer.column = temp_column
-        self.lexer.current_char = temp_char
-        self.current_token = temp_token
+        logging.debug(f"Token Stream: {self.tokens[self.index:-1]}")
 
     def log_ast(self, node: Node):
         if self.verbose:
@@ -46,47 +33,48 @@ class Parser:
         if self.current_token.type == token_type:
             if self.verbose:
                 logging.debug(f"Consuming token: {self.current_token}")
-            self.current_token = self.lexer.get_next_token()
+            self.index += 1
+            self.current_token = self.tokens[self.index]
         else:
             logging.error(f"Token mismatch: Expected {token_type}, got {self.current_token.type} (value: {self.current_token.value}, token: {self.current_token})")
             raise Exception(f"Expected {token_type}, got {self.current_token.type} (value: {self.current_token.value}) at line {self.current_token.line}, column {self.current_token.column}")
 
     def parse(self) -> List[Node]:
         statements = []
-        while self.current_token.type != TokenType.EOF:
+        while self.current_token.type is not TokenType.EOF:
             stmt = self.statement()
             statements.append(stmt)
             self.log_ast(stmt)
-            if self.current_token.type == TokenType.SEMICOLON:
+            if self.current_token.type is TokenType.SEMICOLON:
                 self.eat(TokenType.SEMICOLON)
         return statements
 
     def statement(self) -> Node:
-        if self.current_token.type == TokenType.DEF:
+        if self.current_token.type is TokenType.DEF:
             return self.function_def()
-        elif self.current_token.type == TokenType.STRUCT:
+        elif self.current_token.type is TokenType.STRUCT:
             return self.struct_def()
-        elif self.current_token.type == TokenType.CLASS:
+        elif self.current_token.type is TokenType.CLASS:
             return self.class_def()
-        elif self.current_token.type == TokenType.IF:
+        elif self.current_token.type is TokenType.IF:
             return self.if_stmt()
-        elif self.current_token.type == TokenType.FOR:
+        elif self.current_token.type is TokenType.FOR:
             return self.for_stmt()
-        elif self.current_token.type == TokenType.WHILE:
+        elif self.current_token.type is TokenType.WHILE:
             return self.while_stmt()
-        elif self.current_token.type == TokenType.PRINT:
+        elif self.current_token.type is TokenType.PRINT:
             return self.print_stmt()
-        elif self.current_token.type == TokenType.DELETE:
+        elif self.current_token.type is TokenType.DELETE:
             return self.delete_stmt()
-        elif self.current_token.type == TokenType.PARALLEL:
+        elif self.current_token.type is TokenType.PARALLEL:
             return self.parallel_stmt()
-        elif self.current_token.type == TokenType.RETURN:
+        elif self.current_token.type is TokenType.RETURN:
             return self.return_stmt()
-        elif self.current_token.type == TokenType.ID and self.current_token.value == 'let':
+        elif self.current_token.type is TokenType.ID and self.current_token.value == 'let':
             return self.let_stmt()
-        elif self.current_token.type == TokenType.ID:
+        elif self.current_token.type is TokenType.ID:
             return self.assign_or_call()
-        elif self.current_token.type == TokenType.INPUT:
+        elif self.current_token.type is TokenType.INPUT:
             return self.input_stmt()
         else:
             return self.expr()
@@ -97,26 +85,26 @@ class Parser:
         if self.verbose:
             logging.debug(f"Processing ID: {var_name} at line {line}")
         self.eat(TokenType.ID)
-        if self.current_token.type == TokenType.ASSIGN:
+        if self.current_token.type is TokenType.ASSIGN:
             self.eat(TokenType.ASSIGN)
             value = self.expr()
             return AssignNode(var_name, value, line)
-        elif self.current_token.type == TokenType.DOT:
+        elif self.current_token.type is TokenType.DOT:
             self.eat(TokenType.DOT)
-            if self.current_token.type != TokenType.ID:
+            if self.current_token.type is not TokenType.ID:
                 raise Exception(f"Expected ID after DOT, got {self.current_token.type} at line {self.current_token.line}, column {self.current_token.column}")
             field = self.current_token.value
             field_line = self.current_token.line
             field_column = self.current_token.column
             self.eat(TokenType.ID)
-            if self.current_token.type == TokenType.LPAREN:
+            if self.current_token.type is TokenType.LPAREN:
                 if self.verbose:
                     logging.debug(f"Creating FunctionCallNode for {var_name}.{field} at line {line}")
                 return self.function_call(f"{var_name}.{field}", line)
             if self.verbose:
                 logging.debug(f"Creating FieldAccessNode for {var_name}.{field} at line {line}")
             return FieldAccessNode(var_name, field, line)
-        elif self.current_token.type == TokenType.LPAREN:
+        elif self.current_token.type is TokenType.LPAREN:
             return self.function_call(var_name, line)
         return VarNode(var_name, line)
 
@@ -127,10 +115,10 @@ class Parser:
         self.eat(TokenType.ID)
         self.eat(TokenType.LPAREN)
         params = []
-        if self.current_token.type != TokenType.RPAREN:
+        if self.current_token.type is not TokenType.RPAREN:
             params.append(self.current_token.value)
             self.eat(TokenType.ID)
-            while self.current_token.type == TokenType.COMMA:
+            while self.current_token.type is TokenType.COMMA:
                 self.eat(TokenType.COMMA)
                 params.append(self.current_token.value)
                 self.eat(TokenType.ID)
@@ -138,6 +126,8 @@ class Parser:
         self.eat(TokenType.LBRACE)
         body = self.block()
         self.eat(TokenType.RBRACE)
+        if body.statements and isinstance(body.statements[-1], ReturnNode):
+            body.statements[-1].tail = True
         self.functions[fname] = Function(params, body)
         if self.verbose:
             logging.debug(f"Defined function {fname} with params {params}")
@@ -150,10 +140,10 @@ class Parser:
         self.eat(TokenType.ID)
         self.eat(TokenType.LBRACE)
         fields = []
-        if self.current_token.type != TokenType.RBRACE:
+        if self.current_token.type is not TokenType.RBRACE:
             fields.append(self.current_token.value)
             self.eat(TokenType.ID)
-            while self.current_token.type == TokenType.COMMA:
+            while self.current_token.type is TokenType.COMMA:
                 self.eat(TokenType.COMMA)
                 fields.append(self.current_token.value)
                 self.eat(TokenType.ID)
@@ -169,8 +159,8 @@ class Parser:
         self.eat(TokenType.LBRACE)
         fields = []
         methods = []
-        while self.current_token.type != TokenType.RBRACE:
-            if self.current_token.type == TokenType.DEF:
+        while self.current_token.type is not TokenType.RBRACE:
+            if self.current_token.type is TokenType.DEF:
                 method = self.function_def()
                 methods.append(method)
                 fname = method.fname
@@ -190,7 +180,7 @@ class Parser:
     def if_stmt(self) -> Node:
         line = self.current_token.line
         self.eat(TokenType.IF)
-        if self.current_token.type != TokenType.LPAREN:
+        if self.current_token.type is not TokenType.LPAREN:
             raise Exception(f"Expected TokenType.LPAREN, got {self.current_token.type} at line {self.current_token.line}, column {self.current_token.column}")
         self.eat(TokenType.LPAREN)
         condition = self.expr()
@@ -199,7 +189,7 @@ class Parser:
         then_block = self.block()
         self.eat(TokenType.RBRACE)
         else_block = None
-        if self.current_token.type == TokenType.ELSE:
+        if self.current_token.type is TokenType.ELSE:
             self.eat(TokenType.ELSE)
             self.eat(TokenType.LBRACE)
             else_block = self.block()
@@ -252,10 +242,17 @@ class Parser:
     def parallel_stmt(self) -> Node:
         line = self.current_token.line
         self.eat(TokenType.PARALLEL)
-        self.eat(TokenType.LBRACE)
-        block = self.block()
-        self.eat(TokenType.RBRACE)
-        return ParallelNode(block, line)
+        blocks = []
+        while True:
+            self.eat(TokenType.LBRACE)
+            blocks.append(self.block())
+            self.eat(TokenType.RBRACE)
+            # parallel { ... } and { ... }: `and` cannot start a statement, so
+            # unlike a bare `{`, it never swallows a following array literal
+            if self.current_token.type is not TokenType.AND:
+                break
+            self.eat(TokenType.AND)
+        return ParallelNode(blocks, line)
 
     def return_stmt(self) -> Node:
         line = self.current_token.line
@@ -269,7 +266,7 @@ class Parser:
         var_name = self.current_token.value
         self.eat(TokenType.ID)
         self.eat(TokenType.ASSIGN)
-        if self.current_token.type == TokenType.INPUT:
+        if self.current_token.type is TokenType.INPUT:
             return AssignNode(var_name, self.input_stmt(), line)
         value = self.expr()
         return AssignNode(var_name, value, line)
@@ -287,7 +284,7 @@ class Parser:
         while self.current_token.type not in [TokenType.RBRACE, TokenType.EOF]:
             stmt = self.statement()
             statements.append(stmt)
-            if self.current_token.type == TokenType.SEMICOLON:
+            if self.current_token.type is TokenType.SEMICOLON:
                 self.eat(TokenType.SEMICOLON)
         return BlockNode(statements, line)
 
@@ -296,7 +293,7 @@ class Parser:
 
     def logical_or(self) -> Node:
         node = self.logical_and()
-        while self.current_token.type == TokenType.OR:
+        while self.current_token.type is TokenType.OR:
             line = self.current_token.line
             op = self.current_token.type
             self.eat(TokenType.OR)
@@ -308,7 +305,7 @@ class Parser:
 
     def logical_and(self) -> Node:
         node = self.logical_not()
-        while self.current_token.type == TokenType.AND:
+        while self.current_token.type is TokenType.AND:
             line = self.current_token.line
             op = self.current_token.type
             self.eat(TokenType.AND)
@@ -320,7 +317,7 @@ class Parser:
 
     def logical_not(self) -> Node:
         line = self.current_token.line
-        if self.current_token.type == TokenType.NOT:
+        if self.current_token.type is TokenType.NOT:
             op = self.current_token.type
             self.eat(TokenType.NOT)
             operand = self.logical_not()
@@ -379,7 +376,7 @@ class Parser:
 
     def exponent(self) -> Node:
         node = self.unary()
-        while self.current_token.type == TokenType.EXPONENTIATION:
+        while self.current_token.type is TokenType.EXPONENTIATION:
             line = self.current_token.line
             op = self.current_token.type
             self.eat(TokenType.EXPONENTIATION)
@@ -404,7 +401,7 @@ class Parser:
         token = self.current_token
         if self.verbose:
             logging.debug(f"Parsing primary token: {token}")
-        if token.type == TokenType.NUMBER:
+        if token.type is TokenType.NUMBER:
             self.eat(TokenType.NUMBER)
             try:
                 value = float(token.value)
@@ -413,37 +410,37 @@ class Parser:
                 return NumberNode(value, token.line)
             except ValueError:
                 raise Exception(f"Invalid number format '{token.value}' at line {token.line}, column {token.column}")
-        elif token.type == TokenType.STRING:
+        elif token.type is TokenType.STRING:
             self.eat(TokenType.STRING)
             return StringNode(token.value, token.line)
-        elif token.type == TokenType.TRUE:
+        elif token.type is TokenType.TRUE:
             self.eat(TokenType.TRUE)
             return BoolNode(True, token.line)
-        elif token.type == TokenType.FALSE:
+        elif token.type is TokenType.FALSE:
             self.eat(TokenType.FALSE)
             return BoolNode(False, token.line)
-        elif token.type == TokenType.NULL:
+        elif token.type is TokenType.NULL:
             self.eat(TokenType.NULL)
             return NullNode(token.line)
-        elif token.type == TokenType.ID:
+        elif token.type is TokenType.ID:
             var_name = token.value
             reserved_keywords = ['and', 'or', 'not', 'if', 'else', 'for', 'while', 'def', 'return', 'struct', 'class', 'print', 'true', 'false', 'null', 'delete', 'parallel', 'input']
             if var_name in reserved_keywords:
                 raise Exception(f"Unexpected reserved keyword '{var_name}' used as identifier at line {token.line}, column {token.column}")
             self.eat(TokenType.ID)
-            if self.current_token.type == TokenType.LPAREN:
+            if self.current_token.type is TokenType.LPAREN:
                 if self.verbose:
                     logging.debug(f"Creating FunctionCallNode for {var_name}")
                 return self.function_call(var_name, token.line)
-            elif self.current_token.type == TokenType.DOT:
+            elif self.current_token.type is TokenType.DOT:
                 self.eat(TokenType.DOT)
-                if self.current_token.type != TokenType.ID:
+                if self.current_token.type is not TokenType.ID:
                     raise Exception(f"Expected ID after DOT, got {self.current_token.type} at line {self.current_token.line}, column {self.current_token.column}")
                 field = self.current_token.value
                 field_line = self.current_token.line
                 field_column = self.current_token.column
                 self.eat(TokenType.ID)
-                if self.current_token.type == TokenType.LPAREN:
+                if self.current_token.type is TokenType.LPAREN:
                     fname = f"{var_name}.{field}"
                     if self.verbose:
                         logging.debug(f"Creating FunctionCallNode for {fname} at line {token.line}")
@@ -451,21 +448,21 @@ class Parser:
                 if self.verbose:
                     logging.debug(f"Creating FieldAccessNode for {var_name}.{field} at line {token.line}")
                 return FieldAccessNode(var_name, field, token.line)
-            elif self.current_token.type == TokenType.LBRACE:
+            elif self.current_token.type is TokenType.LBRACE:
                 return self.array_or_struct(var_name, token.line)
             if self.verbose:
                 logging.debug(f"Creating VarNode for {var_name}")
             return VarNode(var_name, token.line)
-        elif token.type == TokenType.LPAREN:
+        elif token.type is TokenType.LPAREN:
             self.eat(TokenType.LPAREN)
-            if self.current_token.type == TokenType.ID and self.current_token.value not in self.functions:
+            if self.current_token.type is TokenType.ID and self.current_token.value not in self.functions:
                 return self.lambda_expr(token.line)
             expr = self.expr()
             self.eat(TokenType.RPAREN)
             return expr
-        elif token.type == TokenType.LBRACE:
+        elif token.type is TokenType.LBRACE:
             return self.array_or_struct(None, token.line)
-        elif token.type == TokenType.INPUT:
+        elif token.type is TokenType.INPUT:
             return self.input_stmt()
         raise Exception(f"Unexpected token {token.type} at line {token.line}, column {token.column}")
 
@@ -474,9 +471,9 @@ class Parser:
             logging.debug(f"Processing function call: {fname} at line {line}")
         self.eat(TokenType.LPAREN)
         args = []
-        if self.current_token.type != TokenType.RPAREN:
+        if self.current_token.type is not TokenType.RPAREN:
             args.append(self.expr())
-            while self.current_token.type == TokenType.COMMA:
+            while self.current_token.type is TokenType.COMMA:
                 self.eat(TokenType.COMMA)
                 args.append(self.expr())
         self.eat(TokenType.RPAREN)
@@ -490,10 +487,10 @@ class Parser:
 
     def lambda_expr(self, line: int) -> Node:
         params = []
-        if self.current_token.type != TokenType.RPAREN:
+        if self.current_token.type is not TokenType.RPAREN:
             params.append(self.current_token.value)
             self.eat(TokenType.ID)
-            while self.current_token.type == TokenType.COMMA:
+            while self.current_token.type is TokenType.COMMA:
                 self.eat(TokenType.COMMA)
                 params.append(self.current_token.value)
                 self.eat(TokenType.ID)
@@ -505,9 +502,9 @@ class Parser:
     def array_or_struct(self, struct_name: str, line: int) -> Node:
         self.eat(TokenType.LBRACE)
         elements = []
-        if self.current_token.type != TokenType.RBRACE:
+        if self.current_token.type is not TokenType.RBRACE:
             elements.append(self.expr())
-            while self.current_token.type == TokenType.COMMA:
+            while self.current_token.type is TokenType.COMMA:
                 self.eat(TokenType.COMMA)
                 elements.append(self.expr())
         self.eat(TokenType.RBRACE)
@@ -0,0 +1,54 @@
+# Command-line runner for .toy programs.
+#
+# The interpreter is a pure-Python dispatch loop, so it runs several times
+# faster under PyPy's tracing JIT with no changes to the program:
+#
+#     pypy3 run.py program.toy
+#     python run.py program.toy --verbose
+
+import logging
+import platform
+import sys
+from typing import List
+from lexer import Lexer
+from parser import Parser
+from interpreter import Interpreter, InputRequired
+
+def print_lines(lines: List[str]):
+    print('\n'.join(lines))
+
+def run_file(filename: str, verbose: bool = False) -> int:
+    with open(filename) as f:
+        code = f.read()
+
+    interpreter = Interpreter(verbose=verbose)
+    # Print as the program runs rather than once each statement finishes
+    interpreter.print_sink = print
+    if verbose and platform.python_implementation() != 'PyPy':
+        logging.debug("Running on CPython; use pypy3 for JIT-compiled execution")
+
+    try:
+        parser = Parser(Lexer(code), verbose=verbose)
+        statements = parser.parse()
+        interpreter.functions.update(parser.functions)
+        interpreter.structs.update(parser.structs)
+        interpreter.variables.update(parser.variables)
+
+        current_stmt = 0
+        while True:
+            try:
+                interpreter.run_statements(statements, current_stmt, print_lines)
+                break
+            except InputRequired as e:
+                interpreter.set_input(input())
+                current_stmt = e.index
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: run.py <file.toy> [--verbose]", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(run_file(sys.argv[1], verbose='--verbose' in sys.argv[2:]))
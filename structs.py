@@ -5,8 +5,14 @@ class StructDef:
     def __init__(self, fields: List[str], methods: Dict[str, Function] = None):
         self.fields = fields
         self.methods = methods or {}
+        self.field_index = {field: i for i, field in enumerate(fields)}
 
 class StructInstance:
-    def __init__(self, struct_name: str, field_values: Dict[str, Any]):
+    def __init__(self, struct_name: str, struct_def: StructDef, values: List[Any]):
         self.struct_name = struct_name
-        self.fields = field_values
\ No newline at end of file
+        self.struct_def = struct_def
+        self.values = values
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        return dict(zip(self.struct_def.fields, self.values))
\ No newline at end of file
@@ -4,7 +4,7 @@ import io
 import contextlib
 
 def run_test(filename, verbose=False, input_value="Alice"):
-    cmd = [sys.executable, "main.py", filename]
+    cmd = [sys.executable, "run.py", filename]
     if verbose:
         cmd.append("--verbose")
     
@@ -78,7 +78,7 @@ def verify_output(test_name, result, expected_stdout, expected_stderr_contains=N
     expected_returncode = 0 if not expected_stderr_contains else 1
     if result["returncode"] != expected_returncode:
         print(f"FAIL: {test_name}")
-        print(f"Expected returncode: {expected_returncode}, Got: {result["returncode"]}")
+        print(f"Expected returncode: {expected_returncode}, Got: {result['returncode']}")
         passed = False
     
     if passed:
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer import Lexer
+from parser import Parser
+from interpreter import Interpreter, InputRequired
+
+def run_program(code: str, inputs=()) -> list:
+    # Runs code the way run.py does and returns the output lines
+    parser = Parser(Lexer(code))
+    statements = parser.parse()
+    interpreter = Interpreter()
+    interpreter.functions.update(parser.functions)
+    interpreter.structs.update(parser.structs)
+    inputs = list(inputs)
+    output = []
+    start = 0
+    while True:
+        try:
+            interpreter.run_statements(statements, start, output.extend)
+            return output
+        except InputRequired as e:
+            interpreter.set_input(inputs.pop(0))
+            start = e.index
+
+@pytest.fixture
+def run():
+    return run_program
@@ -0,0 +1,58 @@
+import pytest
+
+from concurrency import ParallelExecutor
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+
+def parse(code: str) -> list:
+    return Parser(Lexer(code)).parse()
+
+def blocks(code: str) -> list:
+    return list(parse("parallel " + code)[0].blocks)
+
+def setup(code: str) -> Interpreter:
+    interpreter = Interpreter()
+    for statement in parse(code):
+        interpreter.evaluate(statement)
+    return interpreter
+
+def test_blocks_run_in_processes_and_return_output():
+    interpreter = setup("let n = 2;")
+    ParallelExecutor(interpreter).execute_parallel(blocks("{ print(n + 1); } and { print(n * 5); }"))
+    assert interpreter.get_printed() == ['3.0', '10.0']
+
+def test_output_goes_to_print_sink():
+    interpreter = setup("let n = 2;")
+    streamed = []
+    interpreter.print_sink = streamed.append
+    ParallelExecutor(interpreter).execute_parallel(blocks("{ print(n + 1); } and { print('x'); }"))
+    assert streamed == ['3.0', 'x']
+    assert interpreter.streamed
+    assert interpreter.get_printed() == []
+
+def test_lambda_values_run_in_the_child():
+    interpreter = setup("let f = (x) -> x * 2;")
+    ParallelExecutor(interpreter).execute_parallel(blocks("{ print(f(21)); }"))
+    assert interpreter.get_printed() == ['42.0']
+
+def _fail_in_worker():
+    raise TypeError("raised inside the worker")
+
+class FailsInWorker:
+    # Pickles fine here; rebuilding it in the worker raises TypeError
+    def __reduce__(self):
+        return (_fail_in_worker, ())
+
+def test_program_errors_propagate():
+    interpreter = setup("let n = 1;")
+    with pytest.raises(Exception, match="Type mismatch"):
+        ParallelExecutor(interpreter).execute_parallel(blocks("{ print(n + 'a'); }"))
+
+def test_worker_errors_are_not_retried_serially():
+    interpreter = setup("let n = 1;")
+    interpreter.variables['boom'] = FailsInWorker()
+    with pytest.raises(TypeError, match="raised inside the worker"):
+        ParallelExecutor(interpreter).execute_parallel(blocks("{ print(n); }"))
+    # Falling back would have run the block again in this process
+    assert interpreter.get_printed() == []
@@ -0,0 +1,30 @@
+def test_for_body_runs_every_statement(run):
+    code = "let s = 0; for (let i = 0; i < 3; i = i + 1) { s = s + 1; s = s + 10; } print(s);"
+    assert run(code) == ['33.0']
+
+def test_while_body_runs_every_statement(run):
+    assert run("let i = 0; while (i < 3) { print(i); i = i + 1; }") == ['0.0', '1.0', '2.0']
+
+def test_return_unwinds_for_loop(run):
+    code = """
+    def f() {
+        for (let i = 0; i < 10; i = i + 1) { if (i == 3) { return i; } }
+        return 99;
+    }
+    print(f());
+    """
+    assert run(code) == ['3.0']
+
+def test_return_unwinds_while_loop(run):
+    code = """
+    def g(n) {
+        let k = 0;
+        while (true) { k = k + 1; if (k == n) { return k * 2; } }
+    }
+    print(g(4));
+    """
+    assert run(code) == ['8.0']
+
+def test_return_skips_rest_of_function(run):
+    code = "def h() { if (true) { return 1; } print('unreached'); return 2; } print(h());"
+    assert run(code) == ['1.0']
@@ -0,0 +1,25 @@
+import pytest
+
+def test_counting_up(run):
+    assert run("for (let i = 0; i < 3; i = i + 1) { print(i); }") == ['0.0', '1.0', '2.0']
+
+def test_inclusive_limit(run):
+    assert run("for (let i = 0; i <= 2; i = i + 1) { print(i); }") == ['0.0', '1.0', '2.0']
+
+def test_counting_down(run):
+    assert run("for (let i = 10; i > 7; i = i - 1) { print(i); }") == ['10.0', '9.0', '8.0']
+
+def test_body_can_move_loop_variable(run):
+    code = "for (let i = 0; i < 6; i = i + 1) { i = i + 1; print(i); }"
+    assert run(code) == ['1.0', '3.0', '5.0']
+
+def test_body_can_change_limit(run):
+    code = "let n = 3; for (let i = 0; i < n; i = i + 1) { n = 2; print(i); }"
+    assert run(code) == ['0.0', '1.0']
+
+def test_loop_variable_keeps_final_value(run):
+    assert run("for (let i = 0; i < 3; i = i + 1) { } print(i);") == ['3.0']
+
+def test_non_number_loop_variable_falls_back(run):
+    with pytest.raises(Exception, match="Type mismatch in '\\+' operation at line 1"):
+        run("for (let i = 0; i < 2; i = i + 1) { i = 'a'; }")
@@ -0,0 +1,18 @@
+def test_lambda_call(run):
+    assert run("let add = (a, b) -> a + b; print(add(2, 3));") == ['5.0']
+
+def test_lambda_sees_the_calling_scope(run):
+    # Scoping is dynamic, so the body resolves y in the caller's frame
+    assert run("let f = (z) -> y + z; def g() { let y = 5; return f(1); } print(g());") == ['6.0']
+
+def test_lambda_called_from_parallel_blocks(run):
+    code = "let f = (x) -> x + 1; parallel { print(f(1)); } and { print(f(2)); }"
+    assert sorted(run(code)) == ['2.0', '3.0']
+
+def test_lambda_arity_is_checked(run):
+    try:
+        run("let f = (x) -> x; f(1, 2);")
+    except Exception as e:
+        assert str(e) == "Lambda expects 1 arguments, got 2 at line 1"
+    else:
+        raise AssertionError("expected an arity error")
@@ -0,0 +1,19 @@
+import pytest
+
+def test_and_skips_right_operand(run):
+    assert run("print(false and missing);") == ['False']
+
+def test_or_skips_right_operand(run):
+    assert run("print(true or missing);") == ['True']
+
+def test_right_operand_runs_only_when_needed(run):
+    code = "def f() { print(1); return true; } print(false and f()); print(true and f());"
+    assert run(code) == ['False', '1.0', 'True']
+
+def test_both_operands_false(run):
+    assert run("print(false or false);") == ['False']
+
+@pytest.mark.parametrize('code', ["print(true and 1);", "print(1 and true);"])
+def test_non_boolean_operand_is_rejected(run, code):
+    with pytest.raises(Exception, match="Type mismatch in 'AND' operation at line 1"):
+        run(code)
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from lexer import Lexer
+from parser import Parser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_parallel_blocks_joined_with_and(run):
+    assert sorted(run("parallel { print(1); } and { print(2); }")) == ['1.0', '2.0']
+
+def test_brace_after_parallel_is_a_new_statement():
+    statements = Parser(Lexer("parallel { print(1); }\n{1, 2};")).parse()
+    assert len(statements) == 2
+
+NESTED_THROUGH_LAMBDA = """
+import sys
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, sys.argv[1])
+import interpreter
+from conftest import run_program
+# One worker, as on a 1-CPU host, so the outer block fills the pool
+interpreter._parallel_pool = ThreadPoolExecutor(max_workers=1, initializer=interpreter._mark_pool_thread)
+code = "def h(x) { parallel { print(x); } return 0; } let f = (x) -> h(x); parallel { f(1); } print('done');"
+print(run_program(code))
+"""
+
+def test_nested_parallel_through_lambda_does_not_deadlock():
+    # The inner block is reached through a lambda made outside the pool, so it
+    # waited on the pool from the pool's only worker. Run in a subprocess: a
+    # deadlocked pool thread would otherwise keep pytest from exiting
+    result = subprocess.run([sys.executable, '-c', NESTED_THROUGH_LAMBDA, ROOT], cwd=os.path.dirname(__file__),
+                            capture_output=True, text=True, timeout=30)
+    assert result.stdout.strip() == "['1.0', 'done']", result.stderr
+
+def test_parallel_lambda_calls_keep_their_own_frames(run):
+    # Each block calls through a lambda made before the blocks started; the
+    # frames those calls push must land on the block's own scope stack
+    code = """
+    def ident(v) { return v; }
+    let f = (x) -> ident(x);
+    parallel {
+        let a = 0;
+        for (let i = 0; i < 500; i = i + 1) { a = a + f(1); }
+        print(a);
+    } and {
+        let b = 0;
+        for (let j = 0; j < 500; j = j + 1) { b = b + f(2); }
+        print(b);
+    }
+    """
+    assert sorted(run(code)) == ['1000.0', '500.0']
+
+def test_input_inside_parallel_block_is_rejected(run):
+    code = "parallel { let a = input(); print(a); } let b = input(); print(b);"
+    with pytest.raises(Exception, match="input\\(\\) is not allowed inside a parallel block at line 1"):
+        run(code, ['first', 'second'])
+
+def test_input_after_parallel_runs_blocks_once(run):
+    code = "parallel { print(1); } and { print(2); } let b = input(); print(b);"
+    output = run(code, ['second'])
+    assert sorted(output[:2]) == ['1.0', '2.0']
+    assert output[2:] == ['second']
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip('flask')
+
+import main
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(main, 'interpreter_states', main.OrderedDict())
+    return now
+
+def test_saved_session_loads(clock):
+    state = {'index': 1}
+    main.save_session('a', state)
+    assert main.load_session('a') is state
+
+def test_full_store_drops_least_recently_saved(clock, monkeypatch):
+    monkeypatch.setattr(main, 'MAX_SESSIONS', 2)
+    main.save_session('a', {})
+    main.save_session('b', {})
+    main.save_session('a', {})
+    main.save_session('c', {})
+    assert main.load_session('b') is None
+    assert main.load_session('a') is not None
+    assert main.load_session('c') is not None
+
+def test_expired_session_is_not_loaded(clock):
+    main.save_session('a', {})
+    clock[0] += main.SESSION_TTL + 1
+    assert main.load_session('a') is None
+    assert 'a' not in main.interpreter_states
+
+def test_saving_sweeps_expired_sessions(clock):
+    main.save_session('a', {})
+    clock[0] += main.SESSION_TTL + 1
+    main.save_session('b', {})
+    assert list(main.interpreter_states) == ['b']
+
+def test_dropped_session_is_gone(clock):
+    main.save_session('a', {})
+    main.drop_session('a')
+    main.drop_session('a')
+    assert main.load_session('a') is None
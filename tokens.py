@@ -2,6 +2,8 @@ from typing import Any
 from token_type import TokenType
 
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column', 'is_deleted')
+
     def __init__(self, type: TokenType, value: Any, line: int, column: int, is_deleted: bool = False):
         self.type = type
         self.value = value